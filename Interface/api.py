@@ -0,0 +1,79 @@
+import os
+import re
+
+import pandas as pd
+from flask import abort, jsonify, request, send_file
+from werkzeug.utils import secure_filename
+
+import scoring
+import validation
+
+
+def _request_body():
+    # The request stream, capped at scoring.MAX_UPLOAD_BYTES
+    if (request.content_length or 0) > scoring.MAX_UPLOAD_BYTES:
+        raise scoring.UploadTooLarge(f"Upload exceeds {scoring.MAX_UPLOAD_BYTES / (1 << 20):g} MB")
+    return scoring.LimitedStream(request.stream)
+
+
+def _remove(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def register_routes(server):
+    @server.errorhandler(scoring.UploadTooLarge)
+    def upload_too_large(e):
+        return jsonify(error=str(e)), 413
+
+    # -------------------------
+    # Streaming batch scoring
+    # -------------------------
+    # The raw CSV body is read straight from the request stream and scored
+    # chunk by chunk, e.g.:
+    #   curl --data-binary @spectra.csv -H "Content-Type: text/csv" \
+    #        "http://localhost:8050/api/score?filename=spectra.csv"
+    # Add `resample=<id column>` (or just `resample=`) to align spectra from
+    # other instrument grids onto the 1 nm training grid first, and
+    # `validation=clamp|flag` to choose how out-of-range rows are handled.
+    # Bodies over TCO_MAX_UPLOAD_MB get 413; unreadable input gets 400 and
+    # any other failure is a server error (500, logged by Flask).
+    @server.route("/api/score", methods=["POST"])
+    def score_upload():
+        name = secure_filename(request.args.get("filename", "")) or "upload.csv"
+        resample = request.args.get("resample")
+        mode = request.args.get("validation", validation.DEFAULT_MODE)
+        if mode not in validation.MODES:
+            return jsonify(error=f"validation must be one of: {', '.join(validation.MODES)}"), 400
+        job_id, out_path = scoring.new_result_path()
+        try:
+            rows = scoring.score_csv(_request_body(), out_path, resample=resample, mode=mode)
+        except (ValueError, pd.errors.ParserError, UnicodeDecodeError) as e:
+            _remove(out_path)
+            return jsonify(error=str(e)), 400
+        except Exception:
+            _remove(out_path)
+            raise
+
+        return jsonify(
+            id=job_id,
+            rows=rows,
+            download=f"/api/score/{job_id}?filename=scored_{name}",
+        )
+
+    # The batch pages only spool the upload here; scoring then runs as a
+    # background job (see jobs.py) so this worker is free again immediately.
+    # Same size cap as /api/score, so one client cannot fill the results disk
+    @server.route("/api/upload", methods=["POST"])
+    def spool_upload():
+        return jsonify(id=scoring.spool_upload(_request_body()))
+
+    @server.route("/api/score/<job_id>", methods=["GET"])
+    def download_scores(job_id):
+        if not re.fullmatch(r"[0-9a-f]{32}", job_id):
+            abort(404)
+        path = scoring.result_path(job_id)
+        if not os.path.exists(path):
+            abort(404)
+        name = secure_filename(request.args.get("filename", "")) or f"scored_{job_id}.csv"
+        return send_file(path, mimetype="text/csv", as_attachment=True, download_name=name)
@@ -2,7 +2,13 @@ import dash
 from dash import html
 import dash_bootstrap_components as dbc
 # === Initialize App with Dash Pages ===
-app = dash.Dash(__name__, use_pages=True, external_stylesheets=[dbc.themes.BOOTSTRAP])
+import jobs
+app = dash.Dash(
+    __name__,
+    use_pages=True,
+    external_stylesheets=[dbc.themes.BOOTSTRAP],
+    background_callback_manager=jobs.manager,  # long-running jobs (see jobs.py)
+)
 server = app.server
 
 # Register callbacks for predict_zh page
@@ -104,5 +110,21 @@ app.index_string = """
 app.layout = dash.page_container
 from pages.predict_zh import register_callbacks
 register_callbacks(app)
+
+# === Flask API routes (streaming batch scoring) ===
+from api import register_routes
+register_routes(server)
+
+# === Latency metrics (/metrics, Prometheus text format; see metrics.py) ===
+import metrics
+metrics.register(server)
+
+# === Opt-in sampled profiling (TCO_PROFILE / X-TCO-Profile; see profiling.py) ===
+import profiling
+profiling.register(server)
+
+# === Warm-up: precompute default visualize views (see warmup.py) ===
+import warmup
+warmup.start()
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
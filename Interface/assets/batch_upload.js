@@ -0,0 +1,80 @@
+// === Streaming batch upload (/batch, /batch-zh) ===
+// The file is sent as the raw request body and spooled to disk by /api/upload;
+// its id is then handed to Dash, which scores it in a background job.
+(function () {
+    var MESSAGES = {
+        en: {
+            uploading: "Uploading…",
+            done: "Uploaded, scoring in the background…",
+            failed: "Error: "
+        },
+        zh: {
+            uploading: "正在上传…",
+            done: "上传完成，正在后台评分…",
+            failed: "错误: "
+        }
+    };
+
+    function setProgress(lang, pct) {
+        var bar = document.querySelector("#batch-upload-progress-" + lang + " .progress-bar");
+        if (!bar) return;
+        bar.style.width = pct + "%";
+        bar.setAttribute("aria-valuenow", pct);
+        bar.textContent = pct + "%";
+    }
+
+    function upload(lang, button, file) {
+        var msg = MESSAGES[lang] || MESSAGES.en;
+        var status = document.getElementById("batch-status-" + lang);
+
+        var xhr = new XMLHttpRequest();
+        xhr.open("POST", "/api/upload");
+        xhr.setRequestHeader("Content-Type", "text/csv");
+
+        xhr.upload.onprogress = function (e) {
+            if (!e.lengthComputable) return;
+            var pct = Math.floor(100 * e.loaded / e.total);
+            setProgress(lang, pct);
+            status.textContent = file.name + ": " + msg.uploading;
+        };
+        xhr.onload = function () {
+            var body = {};
+            try { body = JSON.parse(xhr.responseText); } catch (err) { body.error = xhr.statusText; }
+            button.disabled = false;
+            if (xhr.status !== 200) {
+                status.textContent = msg.failed + (body.error || xhr.status);
+                return;
+            }
+            setProgress(lang, 100);
+            status.textContent = file.name + ": " + msg.done;
+            // Triggers the background scoring callback on the page
+            window.dash_clientside.set_props("batch-upload-" + lang, {
+                data: {id: body.id, filename: file.name}
+            });
+        };
+        xhr.onerror = function () {
+            button.disabled = false;
+            status.textContent = msg.failed + xhr.statusText;
+        };
+
+        button.disabled = true;
+        setProgress(lang, 0);
+        status.textContent = file.name + ": " + msg.uploading;
+        xhr.send(file);
+    }
+
+    // Dash has no file <input> component, so the picker is created on demand
+    document.addEventListener("click", function (event) {
+        var button = event.target.closest("[data-batch-upload]");
+        if (!button) return;
+
+        var lang = button.getAttribute("data-batch-upload");
+        var picker = document.createElement("input");
+        picker.type = "file";
+        picker.accept = ".csv";
+        picker.onchange = function () {
+            if (picker.files.length) upload(lang, button, picker.files[0]);
+        };
+        picker.click();
+    });
+})();
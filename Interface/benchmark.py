@@ -0,0 +1,209 @@
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+# === Benchmark suite: training and inference hot paths ===
+# Times each benchmark over several repeats, then runs it once more under
+# tracemalloc for its peak Python/NumPy allocation, and writes everything to
+# JSON. With --baseline the run is compared against a stored result and the
+# exit code is 1 if any median time or peak memory regressed by more than
+# --threshold.
+#
+#   python benchmark.py                          # everything, prints a table
+#   python benchmark.py --only predict update_graph --repeat 20
+#   python benchmark.py --output run.json --baseline benchmarks/baseline.json --threshold 0.2
+#   python benchmark.py --save-baseline          # refresh benchmarks/baseline.json
+#
+# Peak memory covers allocations made through Python's allocator (NumPy,
+# pandas, Plotly); native XGBoost buffers are not traced.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(BASE_DIR, "benchmarks", "baseline.json")
+TRAINING_DIR = os.path.join(BASE_DIR, "..", "Machine Learning Codes")
+BATCH_ROWS = 10_000
+
+os.environ.setdefault("TCO_WARMUP", "off")
+
+
+# === Benchmarks ===
+# Each entry returns a zero-argument callable; setup is not timed.
+def _has_smote():
+    return importlib.util.find_spec("imblearn") is not None
+
+
+def _training_split():
+    sys.path.insert(0, TRAINING_DIR)
+    import tco_models
+    df = tco_models.load_dataset(os.path.join(BASE_DIR, "TCO.csv"))
+    # Same split as TCO.py; SMOTE only where imbalanced-learn is installed
+    _, _, _, X_train, _, y_train, _ = tco_models.split_dataset(df, oversample=_has_smote())
+    return tco_models, X_train, y_train
+
+
+def fit_benchmarks():
+    tco_models, X_train, y_train = _training_split()
+    benches = {}
+    for name in tco_models.make_models():
+        def fit(name=name):
+            tco_models.make_models()[name].fit(X_train, y_train)
+        benches[f"fit:{name}"] = fit
+    return benches
+
+
+def predict_benchmarks():
+    import inference
+    rng = np.random.default_rng(0)
+    reference = inference.spectra.df[inference.FEATURES].to_numpy(dtype=np.float64)
+    single = reference[:1]
+    batch = reference[rng.integers(0, len(reference), BATCH_ROWS)]
+    return {
+        "predict_proba:single": lambda: inference.predict_proba(single),
+        f"predict_proba:batch{BATCH_ROWS}": lambda: inference.predict_proba(batch),
+    }
+
+
+def load_benchmarks():
+    import joblib
+    import inference
+    return {
+        "load:artifact": lambda: (inference.load_model(inference.MODEL_FILE), joblib.load(inference.ENCODER_FILE)),
+    }
+
+
+def update_graph_benchmarks():
+    import app  # noqa: F401  (pages can only be imported once the Dash app exists)
+    import figures
+    import inference
+    from pages import visualize
+
+    material = inference.spectra.materials()[0]
+    args = (None, material, list(figures.DEFAULT_RANGE), None, True)
+
+    def cold():
+        # Figure caches and per-material predictions rebuilt from scratch
+        figures.transmission_view.cache_clear()
+        figures.overlay_view.cache_clear()
+        inference._material_predictions.cache_clear()
+        visualize.update_graph(*args)
+
+    return {
+        "update_graph:cold": cold,
+        "update_graph:warm": lambda: visualize.update_graph(*args),
+    }
+
+
+GROUPS = {
+    "fit": fit_benchmarks,
+    "predict": predict_benchmarks,
+    "load": load_benchmarks,
+    "update_graph": update_graph_benchmarks,
+}
+
+
+# === Runner ===
+def measure(func, repeat, warmup=1):
+    for _ in range(warmup):
+        func()
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "median_s": statistics.median(times),
+        "min_s": min(times),
+        "mean_s": statistics.fmean(times),
+        "repeat": repeat,
+        "peak_mb": peak / 2**20,
+    }
+
+
+def environment():
+    import sklearn
+    import xgboost
+    import inference
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} cpu",
+        "numpy": np.__version__,
+        "scikit-learn": sklearn.__version__,
+        "xgboost": xgboost.__version__,
+        "model_version": inference.MODEL_VERSION,
+        "smote": _has_smote(),
+    }
+
+
+def compare(results, baseline, threshold):
+    # Regressions: median time or peak memory above baseline * (1 + threshold)
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        for key in ("median_s", "peak_mb"):
+            if base[key] > 0 and result[key] > base[key] * (1 + threshold):
+                regressions.append((name, key, base[key], result[key]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark training and inference hot paths.")
+    parser.add_argument("--only", nargs="+", choices=list(GROUPS), help="benchmark groups to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark (default: %(default)s)")
+    parser.add_argument("--fit-repeat", type=int, default=1, help="timed runs per model fit (default: %(default)s)")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against this JSON result")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown/memory growth vs the baseline, as a fraction (default: %(default)s)")
+    parser.add_argument("--save-baseline", action="store_true", help=f"also write the results to {os.path.relpath(BASELINE_FILE, BASE_DIR)}")
+    args = parser.parse_args(argv)
+
+    import metrics
+    results = {}
+    with metrics.paused():
+        for group in args.only or list(GROUPS):
+            for name, func in GROUPS[group]().items():
+                results[name] = measure(func, args.fit_repeat if group == "fit" else args.repeat,
+                                        warmup=0 if group == "fit" else 1)
+                r = results[name]
+                print(f"{name:32s} median {r['median_s'] * 1000:10.2f} ms   min {r['min_s'] * 1000:10.2f} ms   peak {r['peak_mb']:8.2f} MB")
+
+    report = {"environment": environment(), "results": results}
+    paths = ([args.output] if args.output else []) + ([BASELINE_FILE] if args.save_baseline else [])
+    for path in paths:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, key, before, after in regressions:
+            print(f"❌ {name} {key}: {before:.4g} -> {after:.4g} (+{(after / before - 1) * 100:.0f}%)", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"✅ No regressions above {args.threshold:.0%} vs {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+import json
+
+import numpy as np
+
+# === Compact tree artifacts ===
+# A StandardScaler + OneVsRestClassifier(XGBClassifier) pipeline flattened into
+# a handful of NumPy arrays (one .npz): every tree of every class booster laid
+# out breadth-first (so child positions need not be stored), with thresholds
+# and leaf values each stored as float16 or float32. Compaction can drop
+# trees whose contribution is negligible (their mean output is folded into the
+# class base margin) and cap tree depth (a cut node becomes a leaf with the
+# weight XGBoost recorded for it). Loading needs NumPy only.
+SUFFIX = ".npz"
+DTYPES = ("float32", "float16")
+ROW_BLOCK = 1 << 21   # rows x trees evaluated per step, bounds temporary memory
+
+
+def _booster_trees(booster):
+    # (base margin, [tree dicts]) from XGBoost's JSON model
+    learner = json.loads(booster.save_raw("json"))["learner"]
+    if learner["objective"]["name"] != "binary:logistic":
+        raise ValueError(f"Unsupported objective: {learner['objective']['name']}")
+    base_score = float(learner["learner_model_param"]["base_score"].strip("[]"))
+    return np.log(base_score / (1 - base_score)), learner["gradient_booster"]["model"]["trees"]
+
+
+def _flatten(tree, max_depth):
+    # Breadth-first re-layout, cutting at max_depth
+    # -> (feature, threshold, leaf, default_left, depth)
+    left, right = tree["left_children"], tree["right_children"]
+    feature, threshold, leaf, default_left = [], [], [], []
+    queue, depth = [(0, 0)], 0
+    while queue:
+        children = []
+        for node, level in queue:
+            depth = max(depth, level)
+            if left[node] == -1 or (max_depth is not None and level >= max_depth):
+                feature.append(-1)
+                threshold.append(0.0)
+                leaf.append(tree["base_weights"][node])
+                default_left.append(False)
+            else:
+                feature.append(tree["split_indices"][node])
+                threshold.append(tree["split_conditions"][node])
+                leaf.append(0.0)
+                default_left.append(bool(tree["default_left"][node]))
+                children += [(left[node], level + 1), (right[node], level + 1)]
+        queue = children
+    return feature, threshold, leaf, default_left, depth
+
+
+def _children(feature, roots):
+    # Breadth-first: the k-th split node of a tree has its children at 2k+1
+    # and 2k+2 within that tree; leaves point at themselves
+    split = feature >= 0
+    before = np.concatenate([[0], np.cumsum(split)])
+    starts = np.repeat(roots, np.diff(np.append(roots, len(feature))))
+    k = before[:-1] - before[starts]
+    return np.where(split, starts + 2 * k + 1, np.arange(len(feature))).astype(np.int32)
+
+
+def _walk(feature, threshold, default_left, left, idx, X):
+    # Advance every (row, tree) pointer one level per step, only those not
+    # yet on a leaf; idx is (rows,) or (rows, trees)
+    shape = idx.shape
+    idx = idx.ravel().copy()
+    offsets = np.repeat(np.arange(len(X)) * X.shape[1], idx.size // len(X))
+    X = X.ravel()
+    active = np.flatnonzero(feature[idx] >= 0)
+    while active.size:
+        node = idx[active]
+        x = X[offsets[active] + feature[node]]
+        node = left[node] + np.where(np.isnan(x), ~default_left[node], ~(x < threshold[node]))
+        idx[active] = node
+        active = active[feature[node] >= 0]
+    return idx.reshape(shape)
+
+
+def _tree_output(feature, threshold, leaf, default_left, X):
+    feature = np.asarray(feature, dtype=np.int8)
+    left = _children(feature, np.zeros(1, dtype=np.int64))
+    idx = _walk(feature, np.asarray(threshold, dtype=np.float32), np.asarray(default_left), left,
+                np.zeros(len(X), dtype=np.int32), X)
+    return np.asarray(leaf, dtype=np.float32)[idx]
+
+
+class CompactModel:
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.leaf = arrays["leaf"]
+        self.default_left = arrays["default_left"]
+        self.roots = arrays["roots"]
+        self.left = _children(self.feature, self.roots)
+        self.class_offsets = arrays["class_offsets"]
+        self.base_margin = arrays["base_margin"]
+        self.mean = arrays["mean"]
+        self.scale = arrays["scale"]
+        self.depth = int(arrays["depth"])
+        self.meta = json.loads(str(arrays["meta"]))
+        self.n_trees = len(self.roots)
+
+    def _margins(self, X):
+        # All trees at once, then the per-class sum of leaf values (trees are
+        # grouped by class)
+        idx = np.broadcast_to(self.roots, (len(X), self.n_trees))
+        idx = _walk(self.feature, self.threshold, self.default_left, self.left, idx, X)
+        summed = np.zeros((len(X), self.n_trees + 1), dtype=np.float64)
+        np.cumsum(self.leaf[idx], axis=1, dtype=np.float64, out=summed[:, 1:])
+        return summed[:, self.class_offsets[1:]] - summed[:, self.class_offsets[:-1]] + self.base_margin
+
+    def predict_proba(self, X):
+        X = ((np.asarray(X, dtype=np.float64) - self.mean) / self.scale).astype(np.float32)
+        step = max(ROW_BLOCK // max(self.n_trees, 1), 1)
+        margins = np.vstack([self._margins(X[i:i + step]) for i in range(0, len(X), step)] or [np.empty((0, len(self.base_margin)))])
+        proba = 1.0 / (1.0 + np.exp(-margins))
+        # Same normalization as OneVsRestClassifier.predict_proba
+        return proba / proba.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        return self.predict_proba(X).argmax(axis=1)
+
+    def save(self, path):
+        np.savez(path, **self.arrays)
+
+
+def compact_pipeline(pipeline, X_reference, tolerance=0.0, max_depth=None,
+                     threshold_dtype="float32", leaf_dtype="float32"):
+    # tolerance: drop trees whose mean |output| on X_reference is below it
+    scaler, ovr = (pipeline.steps[0][1], pipeline.steps[-1][1]) if len(pipeline.steps) > 1 else (None, pipeline.steps[-1][1])
+    mean = scaler.mean_ if scaler is not None else np.zeros(len(X_reference.columns))
+    scale = scaler.scale_ if scaler is not None else np.ones(len(X_reference.columns))
+    X_scaled = ((np.asarray(X_reference, dtype=np.float64) - mean) / scale).astype(np.float32)
+
+    feature, threshold, leaf, default_left, roots, class_offsets, base_margins = [], [], [], [], [], [0], []
+    depth, dropped = 0, 0
+    for estimator in ovr.estimators_:
+        base, trees = _booster_trees(estimator.get_booster())
+        for tree in trees:
+            f, t, v, d, tree_depth = _flatten(tree, max_depth)
+            contribution = _tree_output(f, t, v, d, X_scaled)
+            if np.abs(contribution).mean() < tolerance:
+                base += float(contribution.mean())
+                dropped += 1
+                continue
+            roots.append(len(feature))
+            feature += f
+            threshold += t
+            leaf += v
+            default_left += d
+            depth = max(depth, tree_depth)
+        class_offsets.append(len(roots))
+        base_margins.append(base)
+
+    meta = {"tolerance": tolerance, "max_depth": max_depth, "threshold_dtype": threshold_dtype,
+            "leaf_dtype": leaf_dtype, "dropped_trees": dropped}
+    return CompactModel({
+        "feature": np.asarray(feature, dtype=np.int8),
+        "threshold": np.asarray(threshold, dtype=threshold_dtype),
+        "leaf": np.asarray(leaf, dtype=leaf_dtype),
+        "default_left": np.asarray(default_left, dtype=bool),
+        "roots": np.asarray(roots, dtype=np.int32),
+        "class_offsets": np.asarray(class_offsets, dtype=np.int32),
+        "base_margin": np.asarray(base_margins, dtype=np.float64),
+        "mean": np.asarray(mean, dtype=np.float64),
+        "scale": np.asarray(scale, dtype=np.float64),
+        "depth": np.int32(depth),
+        "meta": np.asarray(json.dumps(meta)),
+    })
+
+
+def load(path):
+    with np.load(path) as data:
+        return CompactModel({key: data[key] for key in data.files})
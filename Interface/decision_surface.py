@@ -0,0 +1,119 @@
+import argparse
+import glob
+import os
+import sys
+import time
+from functools import lru_cache
+
+import numpy as np
+
+import inference
+import spectra
+
+# === Precomputed decision surfaces ===
+# Offline job: evaluate the deployed pipeline on a dense 2-D grid for a pair of
+# features (the other two held at their dataset medians) and store the class
+# and probability rasters as a compressed .npz (uint8 classes, float16
+# probabilities). The visualize pages only load these files, so exploring the
+# class boundaries costs no inference at request time. Each file records the
+# model version it was computed with; the pages refuse to show a surface of
+# another model, so rerun this after every model deploy.
+#
+#   python decision_surface.py                      # default feature pairs
+#   python decision_surface.py --pair Wavelength Transmission --size 512
+SURFACE_DIR = os.path.join(inference.BASE_DIR, "surfaces")
+DEFAULT_PAIRS = [
+    ("Wavelength", "Transmission"),
+    ("Wavelength", "AbsorptionRate"),
+    ("Wavelength", "OpticalDensity"),
+    ("Transmission", "AbsorptionRate"),
+]
+# Spans several decades, so it is gridded (and plotted) on a log scale
+LOG_FEATURES = {"OpticalDensity"}
+CHUNK_ROWS = 65_536
+
+
+def surface_name(x_feature, y_feature):
+    return f"{x_feature}__{y_feature}"
+
+
+def feature_axis(feature, size):
+    values = spectra.df[feature].to_numpy(dtype=np.float64)
+    if feature in LOG_FEATURES:
+        lo = max(values[values > 0].min(), 1e-6)
+        return np.geomspace(lo, values.max(), size)
+    return np.linspace(values.min(), values.max(), size)
+
+
+def compute_surface(x_feature, y_feature, size=256, chunk_rows=CHUNK_ROWS):
+    medians = spectra.df[inference.FEATURES].median()
+    x_axis = feature_axis(x_feature, size)
+    y_axis = feature_axis(y_feature, size)
+
+    # Row-major grid: row i is y_axis[i], column j is x_axis[j]
+    xx, yy = np.meshgrid(x_axis, y_axis)
+    X = np.tile(medians.to_numpy(dtype=np.float64), (xx.size, 1))
+    X[:, inference.FEATURES.index(x_feature)] = xx.ravel()
+    X[:, inference.FEATURES.index(y_feature)] = yy.ravel()
+
+    classes = np.empty(xx.size, dtype=np.uint8)
+    proba = np.empty(xx.size, dtype=np.float16)
+    for start in range(0, xx.size, chunk_rows):
+        p = inference.predict_proba(X[start:start + chunk_rows])
+        classes[start:start + chunk_rows] = p.argmax(axis=1)
+        proba[start:start + chunk_rows] = p.max(axis=1)
+
+    return {
+        "x_feature": np.array(x_feature),
+        "y_feature": np.array(y_feature),
+        "x": x_axis.astype(np.float32),
+        "y": y_axis.astype(np.float32),
+        "classes": classes.reshape(xx.shape),
+        "proba": proba.reshape(xx.shape),
+        "class_names": np.array(inference.classes, dtype=str),
+        "medians": medians.to_numpy(dtype=np.float32),
+        "model_version": np.array(inference.MODEL_VERSION),
+    }
+
+
+def save_surface(surface, directory=SURFACE_DIR):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, surface_name(str(surface["x_feature"]), str(surface["y_feature"])) + ".npz")
+    np.savez_compressed(path, **surface)
+    return path
+
+
+def available_surfaces(directory=SURFACE_DIR):
+    return sorted(os.path.splitext(os.path.basename(p))[0] for p in glob.glob(os.path.join(directory, "*.npz")))
+
+
+@lru_cache(maxsize=16)
+def load_surface(name, directory=SURFACE_DIR):
+    with np.load(os.path.join(directory, f"{name}.npz")) as data:
+        return {key: data[key] for key in data.files}
+
+
+def is_current(surface):
+    # Computed with the model being served?
+    return str(surface.get("model_version", "")) == inference.MODEL_VERSION
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute decision-surface rasters for the deployed model.")
+    parser.add_argument("--pair", nargs=2, action="append", metavar=("X", "Y"), choices=inference.FEATURES,
+                        help="feature pair to map (repeatable; default: %s)" % ", ".join("×".join(p) for p in DEFAULT_PAIRS))
+    parser.add_argument("--size", type=int, default=256, help="grid points per axis (default: %(default)s)")
+    parser.add_argument("--output-dir", default=SURFACE_DIR)
+    args = parser.parse_args(argv)
+
+    for x_feature, y_feature in args.pair or DEFAULT_PAIRS:
+        started = time.perf_counter()
+        surface = compute_surface(x_feature, y_feature, args.size)
+        path = save_surface(surface, args.output_dir)
+        print(f"✅ {x_feature} × {y_feature}: {args.size}×{args.size} grid in "
+              f"{time.perf_counter() - started:.2f}s -> {path} ({os.path.getsize(path) / 1024:.0f} KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
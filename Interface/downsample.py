@@ -0,0 +1,62 @@
+import numpy as np
+
+# === Shape-preserving downsampling for dense spectra ===
+# Both helpers return *indices* into the original arrays so callers can pick
+# any column (or per-point predictions) for the kept points.
+
+
+def minmax_indices(y, n_buckets):
+    # Keep the min and max of each equal-width bucket (fully vectorized)
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+
+    size = int(np.ceil(n / n_buckets))
+    rows = int(np.ceil(n / size))
+    padded = np.full(rows * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(rows, size)
+
+    offsets = np.arange(rows) * size
+    keep = np.concatenate([
+        offsets + np.nanargmin(padded, axis=1),
+        offsets + np.nanargmax(padded, axis=1),
+        [0, n - 1],
+    ])
+    return np.unique(keep)
+
+
+def lttb_indices(x, y, n_out):
+    # Largest-Triangle-Three-Buckets: one vectorized area computation per bucket
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point) is the third vertex
+        nxt_hi = edges[i + 2] if i + 2 < len(edges) else n
+        cx = x[hi:nxt_hi].mean()
+        cy = y[hi:nxt_hi].mean()
+
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - cx) * (by - y[a]) - (x[a] - bx) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def downsample_indices(x, y, max_points):
+    # MinMax pre-selection bounds LTTB's cost on very long inputs
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+    if n > 8 * max_points:
+        pre = minmax_indices(y, 2 * max_points)
+        return pre[lttb_indices(x[pre], y[pre], max_points)]
+    return lttb_indices(x, y, max_points)
@@ -0,0 +1,61 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import inference
+
+# === Ensemble mode ===
+# All six pipelines saved by TCO.py (ensemble/ensemble.json + one .pkl per
+# model) are loaded once per worker. Every request runs them concurrently in a
+# thread pool (XGBoost, sklearn's tree/kNN/SVM kernels and NumPy release the
+# GIL), so latency is about that of the slowest member, and the per-model
+# probabilities are combined by soft voting.
+ENSEMBLE_DIR = os.environ.get("TCO_ENSEMBLE_DIR", os.path.join(inference.BASE_DIR, "ensemble"))
+ENSEMBLE_FILE = "ensemble.json"
+
+
+def load_members(directory=ENSEMBLE_DIR):
+    path = os.path.join(directory, ENSEMBLE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        spec = json.load(f)
+    return {m["name"]: joblib.load(os.path.join(directory, m["file"])) for m in spec["members"]}
+
+
+members = load_members()
+available = bool(members)
+_pool = ThreadPoolExecutor(max_workers=max(len(members), 1), thread_name_prefix="tco-ensemble")
+
+
+def _member_proba(model, X):
+    # One-vs-rest divides by a zero row sum when no member class fires
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return model.predict_proba(X)
+
+
+def member_probas(X):
+    # {model name: (n, n_classes) probabilities}, all members in parallel
+    X = pd.DataFrame(np.asarray(X, dtype=np.float64).reshape(-1, len(inference.FEATURES)), columns=inference.FEATURES)
+    futures = {name: _pool.submit(_member_proba, model, X) for name, model in members.items()}
+    return {name: future.result() for name, future in futures.items()}
+
+
+def soft_vote(probas):
+    # Mean probability over members; a member returning NaN for a row (one-vs-
+    # rest with no positive vote) abstains on that row
+    stacked = np.stack(list(probas.values()))
+    valid = ~np.isnan(stacked).any(axis=2, keepdims=True)
+    vote = np.where(valid, stacked, 0.0).sum(axis=0)
+    total = vote.sum(axis=1, keepdims=True)
+    return np.divide(vote, total, out=np.full_like(vote, 1 / vote.shape[1]), where=total > 0)
+
+
+def predict_proba(X):
+    # (soft-vote probabilities, per-member probabilities)
+    probas = member_probas(X)
+    return soft_vote(probas), probas
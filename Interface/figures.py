@@ -0,0 +1,317 @@
+from functools import lru_cache
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+import inference
+import spectra
+
+FONT_FAMILY = "Poppins, Segoe UI, sans-serif"
+
+GRAPH_STYLE = {
+    "borderRadius": "10px",
+    "boxShadow": "0px 4px 15px rgba(0, 0, 0, 0.1)",
+    "backgroundColor": "white",
+}
+HIDDEN_GRAPH_STYLE = {**GRAPH_STYLE, "display": "none"}
+
+# Plot area of the 850px card (40px padding, 50px side margins); two points per
+# pixel column is all the browser can draw, so traces are capped there.
+PLOT_WIDTH_PX = 670
+MAX_POINTS = 2 * PLOT_WIDTH_PX
+
+DEFAULT_RANGE = (400, 700)
+
+MATERIAL_COLORS = px.colors.qualitative.Plotly
+
+
+def material_color(material):
+    # Stable colour per material across the comparison and prediction overlays
+    names = sorted(set(spectra.materials()) | set(inference.classes))
+    return MATERIAL_COLORS[names.index(material) % len(MATERIAL_COLORS)]
+
+
+# === Base transmission figure ===
+# Built once per page layout; callbacks only send Patch() deltas
+# (trace data, title, axis ranges) so the layout below never travels again.
+# Trace 0 is the measured curve; traces 1.. are the per-class prediction overlay.
+def base_transmission_figure(xaxis_title, yaxis_title, prediction_label="Predicted"):
+    fig = go.Figure(
+        go.Scatter(
+            x=[],
+            y=[],
+            mode="lines",
+            line=dict(color="#007BFF", width=3),
+            fill="tozeroy",
+            fillcolor="rgba(0, 123, 255, 0.15)",
+            hovertemplate="Wavelength=%{x}<br>Transmission=%{y}<extra></extra>",
+            showlegend=False,
+        )
+    )
+    for cls in inference.classes:
+        fig.add_trace(
+            go.Scattergl(
+                x=[],
+                y=[],
+                mode="markers",
+                name=cls,
+                marker=dict(color=material_color(cls), size=7),
+                hovertemplate=f"{prediction_label} {cls}: %{{customdata:.1%}}<extra></extra>",
+            )
+        )
+
+    fig.update_layout(
+        template="plotly_white",
+        title=dict(text="", x=0.5, font=dict(size=22, family=FONT_FAMILY, color="#1F2937")),
+        xaxis_title=xaxis_title,
+        yaxis_title=yaxis_title,
+        xaxis=dict(
+            title_font=dict(size=16, family=FONT_FAMILY),
+            tickfont=dict(size=12, family=FONT_FAMILY),
+            showgrid=False,
+            zeroline=False
+        ),
+        yaxis=dict(
+            title_font=dict(size=16, family=FONT_FAMILY),
+            tickfont=dict(size=12, family=FONT_FAMILY),
+            showgrid=False,
+            zeroline=False
+        ),
+        margin=dict(l=50, r=50, t=70, b=60),
+        height=500,
+        plot_bgcolor="white",   # white top area
+        paper_bgcolor="white",
+        hovermode="x unified",
+        hoverlabel=dict(
+            bgcolor="white",
+            font_size=13,
+            font_family=FONT_FAMILY
+        ),
+        showlegend=False,
+        legend=dict(orientation="h", yanchor="bottom", y=1.0, xanchor="center", x=0.5),
+        transition_duration=600,
+    )
+    return fig
+
+
+# === Figure cache ===
+# Window payloads and comparison figures are pure functions of their inputs,
+# so they are memoised per worker (and pre-filled by warmup.py).
+@lru_cache(maxsize=512)
+def transmission_view(material, lo, hi):
+    curve = spectra.curve(material)
+    window = spectra.window_slice(material, lo, hi)
+    if window.start == window.stop:
+        return None
+
+    # Curves within the point budget go out whole; denser ones per window
+    windowed = len(curve["Wavelength"]) > MAX_POINTS
+    if windowed:
+        _, x, y = spectra.window_points(material, "Transmission", lo, hi, MAX_POINTS)
+    else:
+        x, y = curve["Wavelength"], curve["Transmission"]
+
+    return {
+        "x": x.tolist(),
+        "y": y.tolist(),
+        "y_range": y_range(curve["Transmission"][window]),
+        "windowed": windowed,
+    }
+
+
+@lru_cache(maxsize=512)
+def overlay_view(material, lo, hi):
+    # Per-class marker payloads for the prediction overlay, taken from the
+    # cached per-material batch predictions (no inference on the request path)
+    curve = spectra.curve(material)
+    if len(curve["Wavelength"]) > MAX_POINTS:
+        idx, _, _ = spectra.window_points(material, "Transmission", lo, hi, MAX_POINTS)
+    else:
+        window = spectra.window_slice(material, lo, hi)
+        idx = np.arange(window.start, window.stop)
+
+    predicted, confidence = inference.material_predictions(material)
+    predicted, confidence = predicted[idx], confidence[idx]
+    x, y = curve["Wavelength"][idx], curve["Transmission"][idx]
+
+    traces = []
+    for i in range(len(inference.classes)):
+        mask = predicted == i
+        traces.append({
+            "x": x[mask].tolist(),
+            "y": y[mask].tolist(),
+            "customdata": confidence[mask].tolist(),
+            # Fade low-confidence points
+            "opacity": np.clip(confidence[mask], 0.25, 1.0).tolist(),
+        })
+    return traces
+
+
+def patch_overlay(patched, material, lo, hi, enabled):
+    traces = overlay_view(material, lo, hi) if enabled else None
+    for i in range(len(inference.classes)):
+        trace = traces[i] if traces else {"x": [], "y": [], "customdata": [], "opacity": []}
+        patched["data"][i + 1]["x"] = trace["x"]
+        patched["data"][i + 1]["y"] = trace["y"]
+        patched["data"][i + 1]["customdata"] = trace["customdata"]
+        patched["data"][i + 1]["marker"]["opacity"] = trace["opacity"]
+    patched["layout"]["showlegend"] = bool(enabled)
+    return patched
+
+
+def y_range(values):
+    # Filled area starts at zero; leave 5% headroom above the curve
+    top = float(values.max()) if len(values) else 1.0
+    bottom = min(0.0, float(values.min())) if len(values) else 0.0
+    return [bottom, top * 1.05 if top > 0 else 1.0]
+
+
+# === Multi-material comparison ===
+# WebGL (Scattergl) traces fed straight from the shared NumPy arrays; one
+# stacked subplot per property since their scales differ by orders of magnitude.
+
+@lru_cache(maxsize=128)
+def comparison_figure(materials, properties, lo, hi, property_labels, xaxis_title):
+    # Arguments are tuples so the result can live in the figure cache
+    property_labels = dict(property_labels)
+    fig = make_subplots(rows=len(properties), cols=1, shared_xaxes=True, vertical_spacing=0.06)
+
+    for row, prop in enumerate(properties, start=1):
+        for material in materials:
+            _, x, y = spectra.window_points(material, prop, lo, hi, MAX_POINTS)
+            fig.add_trace(
+                go.Scattergl(
+                    x=x,
+                    y=y,
+                    mode="lines",
+                    name=material,
+                    legendgroup=material,
+                    showlegend=row == 1,
+                    line=dict(color=material_color(material), width=2),
+                    hovertemplate=f"{material}: %{{y:.4g}}<extra></extra>",
+                ),
+                row=row,
+                col=1,
+            )
+        fig.update_yaxes(
+            title_text=property_labels[prop],
+            title_font=dict(size=14, family=FONT_FAMILY),
+            tickfont=dict(size=12, family=FONT_FAMILY),
+            showgrid=False,
+            zeroline=False,
+            row=row,
+            col=1,
+        )
+
+    fig.update_xaxes(range=[lo, hi], showgrid=False, zeroline=False, tickfont=dict(size=12, family=FONT_FAMILY))
+    fig.update_xaxes(title_text=xaxis_title, title_font=dict(size=16, family=FONT_FAMILY), row=len(properties), col=1)
+    fig.update_layout(
+        template="plotly_white",
+        margin=dict(l=60, r=30, t=40, b=60),
+        height=max(350, 260 * len(properties)),
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        hovermode="x unified",
+        hoverlabel=dict(bgcolor="white", font_size=13, font_family=FONT_FAMILY),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
+    )
+    return fig.to_dict()
+
+
+# === Wavelength sweep (Classify page) ===
+def sweep_figure(grid, proba, title, xaxis_title, yaxis_title):
+    fig = go.Figure()
+    for i, cls in enumerate(inference.classes):
+        fig.add_trace(
+            go.Scatter(
+                x=grid,
+                y=proba[:, i],
+                mode="lines",
+                name=cls,
+                line=dict(color=material_color(cls), width=2),
+                hovertemplate=f"{cls}: %{{y:.1%}}<extra></extra>",
+            )
+        )
+    fig.update_layout(
+        template="plotly_white",
+        title=dict(text=title, x=0.5, font=dict(size=16, family=FONT_FAMILY, color="#1F2937")),
+        xaxis=dict(title=xaxis_title, showgrid=False, zeroline=False, range=[grid[0], grid[-1]]),
+        yaxis=dict(title=yaxis_title, showgrid=False, zeroline=False, range=[0, 1], tickformat=".0%"),
+        margin=dict(l=50, r=30, t=60, b=50),
+        height=380,
+        hovermode="x unified",
+        hoverlabel=dict(bgcolor="white", font_size=13, font_family=FONT_FAMILY),
+        legend=dict(orientation="h", yanchor="bottom", y=1.0, xanchor="center", x=0.5),
+    )
+    return fig
+
+
+# === Decision surfaces (rasters from decision_surface.py) ===
+def class_colorscale(names):
+    # Stepwise scale so each integer class index gets one flat colour
+    n = len(names)
+    scale = []
+    for i, name in enumerate(names):
+        scale += [(i / n, material_color(name)), ((i + 1) / n, material_color(name))]
+    return scale
+
+
+def surface_figure(surface, view, axis_labels, confidence_label, log_features=()):
+    names = [str(n) for n in surface["class_names"]]
+    x_feature, y_feature = str(surface["x_feature"]), str(surface["y_feature"])
+    x, y = surface["x"], surface["y"]
+    hover = f"{axis_labels[x_feature]}=%{{x:.4g}}<br>{axis_labels[y_feature]}=%{{y:.4g}}<br>"
+
+    # Confidence travels as whole percents in uint8 (4x smaller than float32)
+    percent = np.rint(surface["proba"].astype(np.float32) * 100).astype(np.uint8)
+
+    if view == "confidence":
+        heatmap = go.Heatmap(
+            x=x, y=y, z=percent,
+            colorscale="Blues", zmax=100,
+            colorbar=dict(title=confidence_label, ticksuffix="%"),
+            hovertemplate=hover + f"{confidence_label}=%{{z}}%<extra></extra>",
+        )
+    else:
+        heatmap = go.Heatmap(
+            x=x, y=y, z=surface["classes"],
+            colorscale=class_colorscale(names), zmin=-0.5, zmax=len(names) - 0.5,
+            customdata=percent,
+            colorbar=dict(tickvals=list(range(len(names))), ticktext=names),
+            hovertemplate=hover + f"{confidence_label}=%{{customdata}}%<extra></extra>",
+        )
+
+    fig = go.Figure(heatmap)
+
+    # Reference measurements on top, to show where the training data lives
+    for material in spectra.materials():
+        curve = spectra.curve(material)
+        fig.add_trace(
+            go.Scattergl(
+                x=curve[x_feature], y=curve[y_feature],
+                mode="markers", name=material,
+                marker=dict(color=material_color(material), size=4, line=dict(color="white", width=0.5)),
+                hoverinfo="skip",
+            )
+        )
+
+    fig.update_layout(
+        template="plotly_white",
+        xaxis=dict(title=axis_labels[x_feature], type="log" if x_feature in log_features else "linear",
+                   showgrid=False, zeroline=False),
+        yaxis=dict(title=axis_labels[y_feature], type="log" if y_feature in log_features else "linear",
+                   showgrid=False, zeroline=False),
+        margin=dict(l=60, r=30, t=40, b=60),
+        height=520,
+        legend=dict(orientation="h", yanchor="bottom", y=1.0, xanchor="center", x=0.5),
+    )
+    fig.update_xaxes(range=_axis_range(x, x_feature in log_features))
+    fig.update_yaxes(range=_axis_range(y, y_feature in log_features))
+    return fig
+
+
+def _axis_range(values, log):
+    lo, hi = float(values[0]), float(values[-1])
+    return [np.log10(lo), np.log10(hi)] if log else [lo, hi]
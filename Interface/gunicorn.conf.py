@@ -0,0 +1,20 @@
+import os
+
+# === gunicorn settings ===
+# Picked up automatically when gunicorn runs from Interface/ (else pass
+# -c gunicorn.conf.py):
+#   gunicorn -w 4 -b 0.0.0.0:8050 app:server
+#   gunicorn -w 4 --preload -b 0.0.0.0:8050 app:server
+
+
+def on_starting(server):
+    # Runs in the master before any worker forks: the master's pid names this
+    # server's metrics group (see metrics.py), with or without --preload
+    os.environ.setdefault("TCO_METRICS_GROUP", str(os.getpid()))
+
+
+def child_exit(server, worker):
+    # An exited worker's (crash, timeout, max_requests) counts move into the
+    # retired totals and its files are removed
+    import metrics
+    metrics.retire(worker.pid)
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import time
+from functools import lru_cache
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import compact
+import metrics
+import portable
+import spectra
+import validation
+from resample import resample_frame
+
+# === Shared inference engine ===
+# The pipeline (Scaler + Model) and label encoder are loaded once per worker and
+# shared by every page and batch path.
+# Paths are anchored here so CLI tools and daemons work from any directory
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# model_manifest.json (written by TCO.py's model selection) names the deployed
+# pipeline; without one the original XGBoost artifact is used
+MANIFEST_FILE = os.path.join(BASE_DIR, "model_manifest.json")
+
+
+def read_manifest(path=MANIFEST_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+MANIFEST = read_manifest()
+MODEL_FILE = os.path.join(BASE_DIR, MANIFEST.get("model_file", "xgb_pipeline_model.pkl"))
+ENCODER_FILE = os.path.join(BASE_DIR, MANIFEST.get("encoder_file", "label_encoder.pkl"))
+FEATURES = ["Wavelength", "AbsorptionRate", "Transmission", "OpticalDensity"]
+
+
+def file_version(*paths):
+    # Short content hash; changes whenever a new artifact is deployed
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def load_model(path):
+    # Portable directories (portable.py) are XGBoost boosters + JSON and
+    # compacted artifacts (Machine Learning Codes/compaction.py) plain NumPy
+    # arrays; everything else is a pickled pipeline
+    if portable.is_portable(path):
+        return portable.load(path)
+    return compact.load(path) if path.endswith(compact.SUFFIX) else joblib.load(path)
+
+
+pipeline = load_model(MODEL_FILE)   # this must be the full pipeline, not just the bare model
+if isinstance(pipeline, portable.PortableModel):
+    # Labels and version come from the artifact's own manifest and checksum
+    label_encoder = portable.Labels(pipeline.classes)
+    MODEL_VERSION = pipeline.checksum[:12]
+else:
+    label_encoder = joblib.load(ENCODER_FILE)
+    MODEL_VERSION = file_version(MODEL_FILE, ENCODER_FILE)
+classes = label_encoder.classes_
+
+
+def predict_proba(X):
+    # One batched call for any number of rows; named columns match training
+    started = time.perf_counter()
+    X = pd.DataFrame(np.asarray(X, dtype=np.float64).reshape(-1, len(FEATURES)), columns=FEATURES)
+    proba = pipeline.predict_proba(X)
+    metrics.observe("predict_proba", "inference", time.perf_counter() - started)
+    metrics.increment("rows_predicted", len(X))
+    return proba
+
+
+@lru_cache(maxsize=64)
+def _material_predictions(material, version):
+    data = spectra.curve(material)
+    proba = predict_proba(np.column_stack([data[f] for f in FEATURES]))
+    return proba.argmax(axis=1), proba.max(axis=1)
+
+
+def material_predictions(material):
+    # (predicted class index, confidence) for every point of a reference curve,
+    # computed in one batch and cached per model version
+    return _material_predictions(material, MODEL_VERSION)
+
+
+# === Whole-spectrum classification ===
+BAND_EDGES = np.arange(300, 801, 50)
+
+
+def spectrum_matrix(frame):
+    # Feature matrix from a sweep table, aligned onto the 1 nm training grid
+    # (any instrument step); extra columns (e.g. Material) are ignored
+    missing = [f for f in FEATURES if f not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    X = resample_frame(frame, FEATURES)[FEATURES].to_numpy(dtype=np.float64)
+    X, ok, _ = validation.validate(X, FEATURES, mode="flag")
+    X = X[ok]
+    if not len(X):
+        raise ValueError("No complete, in-range rows in spectrum")
+    return X
+
+
+def classify_spectrum(X):
+    # One predict_proba call for the whole sweep, pooled by log-probability
+    # voting (mean log-probability per class, i.e. a geometric-mean vote)
+    proba = predict_proba(X)
+    log_votes = np.log(np.clip(proba, 1e-9, 1.0)).mean(axis=0)
+    posterior = np.exp(log_votes - log_votes.max())
+    posterior /= posterior.sum()
+    verdict = int(posterior.argmax())
+
+    # Per-band agreement: share of points in each band voting for the verdict
+    point_pred = proba.argmax(axis=1)
+    band = np.clip(np.digitize(X[:, 0], BAND_EDGES) - 1, 0, len(BAND_EDGES) - 2)
+    n_bands = len(BAND_EDGES) - 1
+    counts = np.bincount(band, minlength=n_bands)
+    agree = np.bincount(band, weights=point_pred == verdict, minlength=n_bands)
+
+    return {
+        "material": classes[verdict],
+        "confidence": float(posterior[verdict]),
+        "posterior": posterior,
+        "n_points": len(X),
+        "bands": [
+            (int(BAND_EDGES[i]), int(BAND_EDGES[i + 1]), int(counts[i]), float(agree[i] / counts[i]))
+            for i in range(n_bands) if counts[i]
+        ],
+    }
+
+
+# === Wavelength sweep ===
+SWEEP_GRID = np.arange(300, 801, dtype=np.float64)
+
+
+@lru_cache(maxsize=256)
+def _wavelength_sweep(absorbance, transmission, optical_density, version):
+    X = np.empty((len(SWEEP_GRID), len(FEATURES)))
+    X[:, 0] = SWEEP_GRID
+    X[:, 1:] = (absorbance, transmission, optical_density)
+    return predict_proba(X)
+
+
+def wavelength_sweep(absorbance, transmission, optical_density):
+    # Class probabilities over 300-800 nm with the other features held fixed,
+    # in one vectorized call; cached per (inputs, model version)
+    return SWEEP_GRID, _wavelength_sweep(float(absorbance), float(transmission), float(optical_density), MODEL_VERSION)
@@ -0,0 +1,49 @@
+import os
+import time
+
+import diskcache
+from dash import DiskcacheManager
+from werkzeug.utils import secure_filename
+
+import scoring
+
+# === Background job manager ===
+# Long jobs (file scoring, ...) run as Dash background callbacks in separate
+# processes managed through a local diskcache, so gunicorn workers only hand
+# out job ids and poll for progress. Results (callback outputs and scored
+# files) are retained for RESULT_TTL seconds.
+JOBS_DIR = os.environ.get("TCO_JOBS_DIR", os.path.join(scoring.RESULTS_DIR, "jobs"))
+RESULT_TTL = int(float(os.environ.get("TCO_RESULT_TTL_HOURS", "24")) * 3600)
+
+cache = diskcache.Cache(JOBS_DIR)
+manager = DiskcacheManager(cache, expire=RESULT_TTL)
+
+
+def cleanup_results(max_age=RESULT_TTL):
+    # Drop scored files and spooled uploads older than the retention window
+    if not os.path.isdir(scoring.RESULTS_DIR):
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for entry in os.scandir(scoring.RESULTS_DIR):
+        if entry.is_file() and entry.stat().st_mtime < cutoff:
+            os.remove(entry.path)
+            removed += 1
+    return removed
+
+
+def run_scoring_job(upload, report=None, resample=None):
+    # Body of the file-scoring background callback: score a spooled upload in
+    # chunks and return (rows, download url); the upload is removed afterwards.
+    # `resample` aligns the spectra onto the training grid first (see scoring)
+    cleanup_results()
+    source = scoring.upload_path(upload["id"])
+    job_id, out_path = scoring.new_result_path()
+    try:
+        rows = scoring.score_csv(source, out_path, progress=report, resample=resample)
+    finally:
+        if os.path.exists(source):
+            os.remove(source)
+
+    name = secure_filename(upload.get("filename", "")) or "upload.csv"
+    return rows, f"/api/score/{job_id}?filename=scored_{name}"
@@ -0,0 +1,252 @@
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+import requests
+
+import spectra
+
+# === Load-testing harness ===
+# Drives the real Dash callback payloads (/_dash-update-component) and the
+# batch API with N concurrent virtual users, then reports throughput, latency
+# percentiles and error rates per action. Either targets a running server or
+# launches gunicorn locally with the requested number of workers.
+#
+#   python loadtest.py --profile predict --users 8 --duration 30 --launch --workers 1
+#   python loadtest.py --profile mixed --users 32 --url http://localhost:8050
+#   python loadtest.py --profile batch --users 2 --requests 50 --launch
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CALLBACK_PATH = "/_dash-update-component"
+
+
+# === Actions: one request each ===
+def _callback_body(outputs, inputs, state):
+    multi = len(outputs) > 1
+    return {
+        "output": "..{}..".format("...".join(f"{i}.{p}" for i, p in outputs)) if multi else f"{outputs[0][0]}.{outputs[0][1]}",
+        "outputs": [{"id": i, "property": p} for i, p in outputs] if multi else {"id": outputs[0][0], "property": outputs[0][1]},
+        "inputs": [{"id": i, "property": p, "value": v} for i, p, v in inputs],
+        "state": [{"id": i, "property": p, "value": v} for i, p, v in state],
+        "changedPropIds": [f"{inputs[0][0]}.{inputs[0][1]}"],
+    }
+
+
+def predict_material(session, url, rng, lang="en"):
+    values = {
+        "wavelength": rng.uniform(300, 800),
+        "absorbance": rng.uniform(0, 1),
+        "transmission": rng.uniform(0, 100),
+        "optical_density": rng.uniform(20, 500),
+    }
+    body = _callback_body(
+        [(f"prediction-output-{lang}", "children")],
+        [(f"predict-btn-{lang}", "n_clicks", 1)],
+        [(f"{k}-{lang}", "value", v) for k, v in values.items()]
+        + [(f"raw-{k}-{lang}", "data", None) for k in values]
+        + [(f"ensemble-mode-{lang}", "value", False)],
+    )
+    return session.post(url + CALLBACK_PATH, json=body)
+
+
+def update_graph(session, url, rng, sfx=""):
+    # The zh page (sfx="-zh") reuses the en input ids; only its outputs, store
+    # and overlay switch are suffixed
+    lo = rng.randrange(300, 700, 10)
+    hi = rng.randrange(lo + 20, 801, 10)
+    body = _callback_body(
+        [(f"transmission-graph{sfx}", "figure"), (f"transmission-graph{sfx}", "style"),
+         (f"transmission-graph-message{sfx}", "children"), (f"transmission-graph-material{sfx}", "data"),
+         (f"transmission-stats{sfx}", "children")],
+        [("show-graph-btn", "n_clicks", 1)],
+        [("material-dropdown", "value", rng.choice(spectra.materials())),
+         ("range-slider", "value", [lo, hi]),
+         (f"transmission-graph-material{sfx}", "data", None),
+         (f"prediction-overlay{sfx}", "value", rng.random() < 0.5)],
+    )
+    return session.post(url + CALLBACK_PATH, json=body)
+
+
+_batch_payloads = {}
+
+
+def batch_score(session, url, rng, rows=5000):
+    # Same CSV every time (built once per size) so runs are comparable
+    if rows not in _batch_payloads:
+        sample = spectra.df.sample(rows, replace=True, random_state=0)
+        _batch_payloads[rows] = sample.drop(columns=["Material"]).to_csv(index=False).encode()
+    return session.post(url + "/api/score?filename=loadtest.csv", data=_batch_payloads[rows],
+                        headers={"Content-Type": "text/csv"})
+
+
+# === Scenario profiles: weighted action mixes ===
+PROFILES = {
+    # Classify page: users clicking Predict
+    "predict": {"predict_material": 1.0},
+    # Visualize page: browsing materials and ranges, half with the overlay
+    "visualize": {"update_graph": 1.0},
+    # Typical production traffic, both languages
+    "mixed": {"predict_material": 0.45, "predict_material_zh": 0.15, "update_graph": 0.25,
+              "update_graph_zh": 0.1, "batch_score": 0.05},
+    # Lab exports through the streaming batch endpoint
+    "batch": {"batch_score": 1.0},
+}
+ACTIONS = {
+    "predict_material": predict_material,
+    "predict_material_zh": lambda session, url, rng: predict_material(session, url, rng, "zh"),
+    "update_graph": update_graph,
+    "update_graph_zh": lambda session, url, rng: update_graph(session, url, rng, "-zh"),
+    "batch_score": batch_score,
+}
+
+
+# === Runner ===
+class LoadTest:
+    def __init__(self, url, profile, users, duration=None, max_requests=None, think=0.0, seed=0):
+        self.url = url.rstrip("/")
+        self.mix = PROFILES[profile]
+        self.users = users
+        self.duration = duration
+        self.max_requests = max_requests
+        self.think = think
+        self.seed = seed
+        self.samples = defaultdict(list)   # action -> [(latency_s, ok)]
+        self.exceptions = defaultdict(int)   # (action, exception type) -> count
+        self._lock = threading.Lock()
+        self._issued = 0
+
+    def _next_ticket(self):
+        with self._lock:
+            if self.max_requests is not None and self._issued >= self.max_requests:
+                return False
+            self._issued += 1
+            return True
+
+    def _user(self, index, deadline):
+        rng = random.Random(self.seed + index)
+        names, weights = list(self.mix), list(self.mix.values())
+        session = requests.Session()
+        while (deadline is None or time.perf_counter() < deadline) and self._next_ticket():
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                ok = ACTIONS[name](session, self.url, rng).status_code == 200
+            except requests.RequestException:
+                ok = False
+            except Exception as e:
+                # A client-side bug counts as a failed request instead of
+                # silently ending this user's thread
+                ok = False
+                with self._lock:
+                    self.exceptions[name, type(e).__name__] += 1
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.samples[name].append((elapsed, ok))
+            if self.think:
+                time.sleep(rng.expovariate(1 / self.think))
+
+    def run(self):
+        started = time.perf_counter()
+        deadline = started + self.duration if self.duration else None
+        threads = [threading.Thread(target=self._user, args=(i, deadline), daemon=True) for i in range(self.users)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - started
+
+    def report(self, elapsed):
+        rows = []
+        everything = [s for samples in self.samples.values() for s in samples]
+        for name, samples in sorted(self.samples.items()) + [("total", everything)]:
+            latency = np.array([s[0] for s in samples]) * 1000
+            errors = sum(not s[1] for s in samples)
+            p50, p95, p99 = np.percentile(latency, [50, 95, 99]) if len(latency) else (np.nan,) * 3
+            rows.append({
+                "action": name,
+                "requests": len(samples),
+                "throughput_rps": len(samples) / elapsed if elapsed else 0.0,
+                "p50_ms": p50, "p95_ms": p95, "p99_ms": p99,
+                "max_ms": latency.max() if len(latency) else np.nan,
+                "error_rate": errors / len(samples) if samples else 0.0,
+            })
+        return rows
+
+
+def print_report(rows, elapsed, users, exceptions=None):
+    print(f"\n{users} users, {elapsed:.1f}s")
+    print(f"{'action':18s} {'requests':>9s} {'req/s':>8s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'max ms':>9s} {'errors':>7s}")
+    for r in rows:
+        print(f"{r['action']:18s} {r['requests']:9d} {r['throughput_rps']:8.1f} {r['p50_ms']:9.1f} {r['p95_ms']:9.1f} "
+              f"{r['p99_ms']:9.1f} {r['max_ms']:9.1f} {r['error_rate']:7.1%}")
+    for (name, error), count in sorted((exceptions or {}).items()):
+        print(f"❌ {name}: {count} request(s) raised {error}")
+
+
+# === Local server ===
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def launch_server(workers, timeout=60):
+    # gunicorn app:server on a free port; returns (process, url) once it answers
+    port = _free_port()
+    env = dict(os.environ, TCO_WARMUP=os.environ.get("TCO_WARMUP", "sync"))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-w", str(workers), "-b", f"127.0.0.1:{port}", "app:server"],
+        cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise SystemExit("gunicorn exited during startup")
+        try:
+            requests.get(url + "/_dash-layout", timeout=2)
+            return process, url
+        except requests.RequestException:
+            time.sleep(0.5)
+    process.terminate()
+    raise SystemExit(f"Server did not come up within {timeout}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the Dash callbacks and batch API.")
+    parser.add_argument("--profile", choices=list(PROFILES), default="mixed", help="scenario (default: %(default)s)")
+    parser.add_argument("--users", type=int, nargs="+", default=[8],
+                        help="concurrent virtual users; several values run one step each (e.g. 1 2 4 8 16)")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per step (default: %(default)s)")
+    parser.add_argument("--requests", type=int, help="stop each step after this many requests instead")
+    parser.add_argument("--think", type=float, default=0.0, help="mean think time between a user's requests, seconds")
+    parser.add_argument("--url", default="http://127.0.0.1:8050", help="target server (default: %(default)s)")
+    parser.add_argument("--launch", action="store_true", help="start gunicorn locally instead of using --url")
+    parser.add_argument("--workers", type=int, default=1, help="gunicorn workers with --launch (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    process = None
+    url = args.url
+    if args.launch:
+        process, url = launch_server(args.workers)
+        print(f"Launched gunicorn with {args.workers} worker(s) at {url}")
+    try:
+        for users in args.users:
+            test = LoadTest(url, args.profile, users, None if args.requests else args.duration, args.requests, args.think)
+            elapsed = test.run()
+            print_report(test.report(elapsed), elapsed, users, test.exceptions)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,337 @@
+import bisect
+import contextlib
+import functools
+import json
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:   # Windows dev server: single process, no locking needed
+    fcntl = None
+
+import numpy as np
+from flask import Response, g, has_request_context, request
+
+# === Latency metrics ===
+# Fixed log-spaced histograms per (callback, stage), kept in a small memory-
+# mapped file per process so every gunicorn worker (and its background job
+# processes) records without locks across processes; /metrics sums the files
+# of all workers of this server and renders Prometheus text format. Files of
+# exited processes (workers, background jobs) are folded into one retired
+# total on every scrape and then removed, so counters never go backwards and
+# the directory only holds live processes.
+#
+# Stages: validation, inference, response (figure/component building), overlay
+# (visualize: prediction markers patched in from cached predictions), serialization
+# (Dash/Flask dispatch + JSON encoding: request time minus callback time),
+# plus callback and request totals.
+METRICS_DIR = os.environ.get("TCO_METRICS_DIR", os.path.join(tempfile.gettempdir(), "tco-metrics"))
+# All processes of one server share a group: gunicorn.conf.py sets it to the
+# master's pid before any worker forks; a server started any other way uses
+# its own pid. Children inherit it. Set TCO_METRICS_GROUP explicitly when
+# several servers share a master process (e.g. one pid namespace per container)
+GROUP = os.environ.setdefault("TCO_METRICS_GROUP", str(os.getpid()))
+
+# 100 us .. ~50 s in quarter-octave steps; exposed at every octave
+BOUNDS = [1e-4 * 2 ** (k / 4) for k in range(77)]
+EXPOSED = list(range(0, len(BOUNDS), 4))
+QUANTILES = (0.5, 0.95, 0.99)
+MAX_SERIES = 256
+WIDTH = len(BOUNDS) + 3   # bucket counts, +Inf bucket, sum, count
+
+_lock = threading.Lock()
+_local = threading.local()
+_pid = None
+_table = None
+_keys = {}
+
+
+def _group_dir():
+    return os.path.join(METRICS_DIR, GROUP)
+
+
+def _open():
+    # Per-process file, (re)created lazily so forked children get their own.
+    # Written through a memoryview: plain float adds, no NumPy on the hot path
+    global _pid, _table, _keys
+    _pid = os.getpid()
+    os.makedirs(_group_dir(), exist_ok=True)
+    path = os.path.join(_group_dir(), f"{_pid}.bin")
+    size = MAX_SERIES * WIDTH * 8
+    with open(path, "wb+") as f:
+        f.truncate(size)
+        _table = memoryview(mmap.mmap(f.fileno(), size)).cast("d")
+    _keys = {}
+
+
+def _slot(key):
+    slot = _keys.get(key)
+    if slot is None:
+        if len(_keys) >= MAX_SERIES:
+            return None
+        slot = _keys[key] = len(_keys)
+        tmp = os.path.join(_group_dir(), f"{_pid}.keys.tmp")
+        with open(tmp, "w") as f:
+            json.dump(list(_keys), f)
+        os.replace(tmp, os.path.join(_group_dir(), f"{_pid}.keys"))
+    return slot
+
+
+def _row(key):
+    # Offset of the series' row in the flat table
+    if _pid != os.getpid():
+        _open()
+    slot = _slot(key)
+    return None if slot is None else slot * WIDTH
+
+
+def observe(callback, stage, seconds):
+    if getattr(_local, "paused", False):
+        return
+    bucket = bisect.bisect_left(BOUNDS, seconds)
+    with _lock:
+        row = _row(f"{callback}\t{stage}")
+        if row is not None:
+            _table[row + bucket] += 1
+            _table[row + WIDTH - 2] += seconds
+            _table[row + WIDTH - 1] += 1
+
+
+def increment(counter, amount=1):
+    # Plain counters (e.g. rows scored) share the same files
+    if getattr(_local, "paused", False):
+        return
+    with _lock:
+        row = _row(f"{counter}\t")
+        if row is not None:
+            _table[row + WIDTH - 2] += amount
+
+
+@contextlib.contextmanager
+def paused():
+    # Nothing is recorded from this thread inside the block (e.g. warm-up)
+    _local.paused = True
+    try:
+        yield
+    finally:
+        _local.paused = False
+
+
+def stopwatch(callback):
+    # lap(stage) records the time since the previous lap (or since creation)
+    last = [time.perf_counter()]
+
+    def lap(stage):
+        now = time.perf_counter()
+        observe(callback, stage, now - last[0])
+        last[0] = now
+
+    return lap
+
+
+def instrument(callback):
+    # Callback total; the remainder of the request counts as serialization
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                observe(callback, "callback", elapsed)
+                if has_request_context():
+                    g.tco_callback = (callback, elapsed)
+        return wrapper
+    return decorate
+
+
+# === Aggregation across workers ===
+RETIRED_FILE = "retired.json"   # {key: summed row} of exited processes
+
+
+@contextlib.contextmanager
+def _locked():
+    # Serializes scrapes and retirements of one server
+    os.makedirs(_group_dir(), exist_ok=True)
+    with open(os.path.join(_group_dir(), ".lock"), "w") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def _read_process(folder, pid):
+    with open(os.path.join(folder, f"{pid}.keys")) as f:
+        keys = json.load(f)
+    table = np.fromfile(os.path.join(folder, f"{pid}.bin"), dtype=np.float64).reshape(-1, WIDTH)
+    return keys, table
+
+
+def _read_retired(folder):
+    try:
+        with open(os.path.join(folder, RETIRED_FILE)) as f:
+            return {key: np.asarray(row, dtype=np.float64) for key, row in json.load(f).items()}
+    except (OSError, ValueError):
+        return {}
+
+
+def _retire(folder, pids):
+    # Add the processes' rows to the retired totals, then drop their files
+    retired = _read_retired(folder)
+    for pid in pids:
+        try:
+            keys, table = _read_process(folder, pid)
+        except (OSError, ValueError):
+            keys, table = [], None
+        for i, key in enumerate(keys):
+            retired[key] = retired[key] + table[i] if key in retired else table[i].copy()
+    tmp = os.path.join(folder, RETIRED_FILE + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump({key: row.tolist() for key, row in retired.items()}, f)
+    os.replace(tmp, os.path.join(folder, RETIRED_FILE))
+    for pid in pids:
+        for suffix in (".bin", ".keys", ".keys.tmp"):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.join(folder, f"{pid}{suffix}"))
+
+
+def _dead_pids(folder):
+    pids = {name.split(".")[0] for name in os.listdir(folder)}
+    return sorted(pid for pid in pids if pid.isdigit() and not _alive(int(pid)))
+
+
+def retire(pid):
+    # A process of this server exited (gunicorn.conf.py's child_exit)
+    if os.path.isdir(_group_dir()):
+        with _locked():
+            _retire(_group_dir(), [str(pid)])
+
+
+def collect():
+    # {(callback, stage): summed row} over every process of this server,
+    # live ones plus the retired totals
+    merged = {}
+    folder = _group_dir()
+    if not os.path.isdir(folder):
+        return merged
+    with _locked():
+        dead = _dead_pids(folder)
+        if dead:
+            _retire(folder, dead)
+        rows = list(_read_retired(folder).items())
+        for name in os.listdir(folder):
+            if not name.endswith(".keys"):
+                continue
+            try:
+                keys, table = _read_process(folder, name[:-len(".keys")])
+            except (OSError, ValueError):
+                continue
+            rows += zip(keys, table)
+    for key, row in rows:
+        key = tuple(key.split("\t"))
+        merged[key] = merged[key] + row if key in merged else row.copy()
+    return merged
+
+
+def quantile(row, q):
+    # histogram_quantile-style estimate, linear within the bucket
+    counts = row[:len(BOUNDS) + 1]
+    total = counts.sum()
+    if not total:
+        return float("nan")
+    rank = q * total
+    cumulative = np.cumsum(counts)
+    i = int(np.searchsorted(cumulative, rank))
+    if i >= len(BOUNDS):
+        return BOUNDS[-1]
+    lower = BOUNDS[i - 1] if i else 0.0
+    before = cumulative[i - 1] if i else 0.0
+    return lower + (BOUNDS[i] - lower) * (rank - before) / counts[i]
+
+
+def render():
+    lines = [
+        "# HELP tco_stage_seconds Latency of instrumented callbacks and API routes by stage.",
+        "# TYPE tco_stage_seconds histogram",
+    ]
+    merged = collect()
+    counters = {key[0]: row[-2] for key, row in merged.items() if not key[1]}
+    merged = {key: row for key, row in merged.items() if key[1]}
+    for (callback, stage), row in sorted(merged.items()):
+        labels = f'callback="{callback}",stage="{stage}"'
+        cumulative = np.cumsum(row[:len(BOUNDS)])
+        for i in EXPOSED:
+            lines.append(f'tco_stage_seconds_bucket{{{labels},le="{BOUNDS[i]:.6g}"}} {cumulative[i]:.0f}')
+        lines.append(f'tco_stage_seconds_bucket{{{labels},le="+Inf"}} {row[-1]:.0f}')
+        lines.append(f"tco_stage_seconds_sum{{{labels}}} {row[-2]:.9g}")
+        lines.append(f"tco_stage_seconds_count{{{labels}}} {row[-1]:.0f}")
+
+    lines += [
+        "# HELP tco_stage_quantile_seconds p50/p95/p99 estimated from tco_stage_seconds (all workers).",
+        "# TYPE tco_stage_quantile_seconds gauge",
+    ]
+    for (callback, stage), row in sorted(merged.items()):
+        for q in QUANTILES:
+            lines.append(f'tco_stage_quantile_seconds{{callback="{callback}",stage="{stage}",quantile="{q}"}} {quantile(row, q):.6g}')
+
+    for name, value in sorted(counters.items()):
+        lines += [f"# TYPE tco_{name}_total counter", f"tco_{name}_total {value:.0f}"]
+    return "\n".join(lines) + "\n"
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _prune_stale():
+    # Drop the files of servers that are no longer running, and retire those
+    # of this server's exited processes
+    if not os.path.isdir(METRICS_DIR):
+        return
+    for name in os.listdir(METRICS_DIR):
+        if name != GROUP and name.isdigit() and not _alive(int(name)):
+            shutil.rmtree(os.path.join(METRICS_DIR, name), ignore_errors=True)
+    if os.path.isdir(_group_dir()):
+        with _locked():
+            dead = _dead_pids(_group_dir())
+            if dead:
+                _retire(_group_dir(), dead)
+
+
+# === Flask wiring ===
+def register(server):
+    _prune_stale()
+
+    @server.before_request
+    def _start_timer():
+        g.tco_started = time.perf_counter()
+
+    @server.after_request
+    def _record_request(response):
+        started = g.get("tco_started")
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        instrumented = g.get("tco_callback")
+        if instrumented:
+            callback, callback_seconds = instrumented
+            observe(callback, "serialization", max(elapsed - callback_seconds, 0.0))
+            observe(callback, "request", elapsed)
+        elif request.path.startswith("/api/"):
+            observe(request.endpoint or "api", "request", elapsed)
+        return response
+
+    @server.route("/metrics")
+    def prometheus_metrics():
+        return Response(render(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,122 @@
+import dash
+from dash import html, dcc, Input, Output, State
+import dash_bootstrap_components as dbc
+
+import jobs
+
+dash.register_page(__name__, path="/batch")
+
+# The upload is driven by assets/batch_upload.js, which streams the file to
+# /api/upload (see api.py) and then puts its id into the batch-upload store
+layout = html.Div(
+    style={
+        "backgroundImage": "url('/assets/pic2.png')",
+        "backgroundSize": "cover",
+        "backgroundPosition": "center",
+        "minHeight": "100vh",
+        "display": "flex",
+        "justifyContent": "center",
+        "alignItems": "center",
+        "padding": "20px",
+    },
+    children=[
+        html.Div(
+            className="header",
+            children=[
+                # Left: Home button
+                html.A("TCO Classifier", href="/", className="home-btn"),
+
+                # Middle: Language toggle
+                html.Div(
+                    style={"display": "flex", "alignItems": "center", "gap": "10px"},
+                    children=[
+                        dbc.Button("🇺🇸 English", href="/batch", color="primary", className="mx-1"),
+                        dbc.Button("🇨🇳 中文", href="/batch-zh", color="light", className="mx-1"),
+                    ],
+                ),
+
+                # Right: Exit button
+                html.A(
+                    href="/",
+                    className="exit-btn",
+                    children=html.Img(
+                        src="/assets/exit.svg",
+                        alt="Exit Icon",
+                        className="exit-icon",
+                    ),
+                ),
+            ],
+        ),
+
+        html.Div(
+            style={
+                "backgroundColor": "white",
+                "padding": "40px",
+                "borderRadius": "15px",
+                "boxShadow": "0px 4px 15px rgba(0, 0, 0, 0.2)",
+                "width": "800px",
+                "maxWidth": "90%",
+            },
+            children=[
+                html.H2("📦 Batch Classification", style={"textAlign": "center", "marginBottom": "20px"}),
+                html.P("Score a large CSV export (Wavelength, AbsorptionRate, Transmission, OpticalDensity). The file is uploaded in a stream and scored in chunks by a background job; the results add a Predicted column and one probability column per material.", style={"fontSize": "14px", "color": "#555", "textAlign": "center"}),
+
+                dbc.Checkbox(id="batch-resample-en", label="Align spectra onto the 1 nm 300–800 nm training grid first", value=False, className="mb-2"),
+                dbc.Input(id="batch-group-en", placeholder="Spectrum ID column (leave empty for a single spectrum)", size="sm", className="mb-3"),
+
+                html.Button(
+                    "📂 Choose a CSV and Score",
+                    id="batch-upload-btn-en",
+                    className="btn btn-primary w-100",
+                    **{"data-batch-upload": "en"},
+                ),
+
+                dcc.Store(id="batch-upload-en"),
+                html.Label("Upload", className="mt-4"),
+                dbc.Progress(id="batch-upload-progress-en", value=0, striped=True),
+                html.Label("Scoring", className="mt-3"),
+                dbc.Progress(id="batch-progress-en", value=0, striped=True, animated=True),
+                html.Div(id="batch-status-en", className="mt-3", style={"textAlign": "center"}),
+                html.Div(
+                    dbc.Button("⏹️ Cancel", id="batch-cancel-en", color="secondary", size="sm", disabled=True),
+                    className="mt-2",
+                    style={"textAlign": "center"},
+                ),
+                html.Div(id="batch-result-en", className="mt-3", style={"textAlign": "center"}),
+
+                html.Div(
+                    html.A("← Back to single-point classification", href="/predict"),
+                    className="mt-4",
+                    style={"textAlign": "center"},
+                ),
+            ]
+        )
+    ]
+)
+
+
+# === Background scoring job: progress, cancellation, retained result ===
+@dash.callback(
+    Output("batch-result-en", "children"),
+    Input("batch-upload-en", "data"),
+    State("batch-resample-en", "value"),
+    State("batch-group-en", "value"),
+    background=True,
+    progress=[Output("batch-progress-en", "value"), Output("batch-progress-en", "label")],
+    running=[(Output("batch-cancel-en", "disabled"), False, True)],
+    cancel=[Input("batch-cancel-en", "n_clicks")],
+    prevent_initial_call=True,
+)
+def score_upload_job(set_progress, upload, resample=False, group=None):
+    def report(rows, fraction):
+        set_progress((int(100 * fraction) if fraction is not None else 0, f"{rows:,} rows"))
+
+    try:
+        rows, download = jobs.run_scoring_job(upload, report, (group or "").strip() if resample else None)
+    except Exception as e:
+        return dbc.Alert(f"Error: {str(e)}", color="danger")
+
+    return html.Div([
+        html.Div(f"✅ Scored {rows:,} rows."),
+        html.A("⬇️ Download results", href=download, className="btn btn-success mt-2"),
+    ])
@@ -0,0 +1,122 @@
+import dash
+from dash import html, dcc, Input, Output, State
+import dash_bootstrap_components as dbc
+
+import jobs
+
+dash.register_page(__name__, path="/batch-zh")
+
+# The upload is driven by assets/batch_upload.js, which streams the file to
+# /api/upload (see api.py) and then puts its id into the batch-upload store
+layout = html.Div(
+    style={
+        "backgroundImage": "url('/assets/pic2.png')",
+        "backgroundSize": "cover",
+        "backgroundPosition": "center",
+        "minHeight": "100vh",
+        "display": "flex",
+        "justifyContent": "center",
+        "alignItems": "center",
+        "padding": "20px",
+    },
+    children=[
+        html.Div(
+            className="header",
+            children=[
+                # Left: Home button
+                html.A("TCO 材料分类", href="/home-zh", className="home-btn"),
+
+                # Middle: Language toggle
+                html.Div(
+                    style={"display": "flex", "alignItems": "center", "gap": "10px"},
+                    children=[
+                        dbc.Button("🇺🇸 English", href="/batch", color="light", className="mx-1"),
+                        dbc.Button("🇨🇳 中文", href="/batch-zh", color="primary", className="mx-1"),
+                    ],
+                ),
+
+                # Right: Exit button
+                html.A(
+                    href="/home-zh",
+                    className="exit-btn",
+                    children=html.Img(
+                        src="/assets/exit.svg",
+                        alt="退出",
+                        className="exit-icon",
+                    ),
+                ),
+            ],
+        ),
+
+        html.Div(
+            style={
+                "backgroundColor": "white",
+                "padding": "40px",
+                "borderRadius": "15px",
+                "boxShadow": "0px 4px 15px rgba(0, 0, 0, 0.2)",
+                "width": "800px",
+                "maxWidth": "90%",
+            },
+            children=[
+                html.H2("📦 批量分类", style={"textAlign": "center", "marginBottom": "20px"}),
+                html.P("对大型 CSV 导出文件（Wavelength、AbsorptionRate、Transmission、OpticalDensity）进行评分。文件以流式方式上传，并由后台任务分块评分；结果将添加预测列以及每种材料的概率列。", style={"fontSize": "14px", "color": "#555", "textAlign": "center"}),
+
+                dbc.Checkbox(id="batch-resample-zh", label="先将光谱对齐到 1 nm、300–800 nm 的训练网格", value=False, className="mb-2"),
+                dbc.Input(id="batch-group-zh", placeholder="光谱 ID 列（单条光谱可留空）", size="sm", className="mb-3"),
+
+                html.Button(
+                    "📂 选择 CSV 并评分",
+                    id="batch-upload-btn-zh",
+                    className="btn btn-primary w-100",
+                    **{"data-batch-upload": "zh"},
+                ),
+
+                dcc.Store(id="batch-upload-zh"),
+                html.Label("上传", className="mt-4"),
+                dbc.Progress(id="batch-upload-progress-zh", value=0, striped=True),
+                html.Label("评分", className="mt-3"),
+                dbc.Progress(id="batch-progress-zh", value=0, striped=True, animated=True),
+                html.Div(id="batch-status-zh", className="mt-3", style={"textAlign": "center"}),
+                html.Div(
+                    dbc.Button("⏹️ 取消", id="batch-cancel-zh", color="secondary", size="sm", disabled=True),
+                    className="mt-2",
+                    style={"textAlign": "center"},
+                ),
+                html.Div(id="batch-result-zh", className="mt-3", style={"textAlign": "center"}),
+
+                html.Div(
+                    html.A("← 返回单点分类", href="/predict-zh"),
+                    className="mt-4",
+                    style={"textAlign": "center"},
+                ),
+            ]
+        )
+    ]
+)
+
+
+# === Background scoring job: progress, cancellation, retained result ===
+@dash.callback(
+    Output("batch-result-zh", "children"),
+    Input("batch-upload-zh", "data"),
+    State("batch-resample-zh", "value"),
+    State("batch-group-zh", "value"),
+    background=True,
+    progress=[Output("batch-progress-zh", "value"), Output("batch-progress-zh", "label")],
+    running=[(Output("batch-cancel-zh", "disabled"), False, True)],
+    cancel=[Input("batch-cancel-zh", "n_clicks")],
+    prevent_initial_call=True,
+)
+def score_upload_job(set_progress, upload, resample=False, group=None):
+    def report(rows, fraction):
+        set_progress((int(100 * fraction) if fraction is not None else 0, f"{rows:,} 行"))
+
+    try:
+        rows, download = jobs.run_scoring_job(upload, report, (group or "").strip() if resample else None)
+    except Exception as e:
+        return dbc.Alert(f"错误: {str(e)}", color="danger")
+
+    return html.Div([
+        html.Div(f"✅ 已评分 {rows:,} 行。"),
+        html.A("⬇️ 下载结果", href=download, className="btn btn-success mt-2"),
+    ])
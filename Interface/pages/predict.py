@@ -1,12 +1,19 @@
 import dash
 from dash import html, dcc, Input, Output, State
 import dash_bootstrap_components as dbc
-import joblib
+import base64
+import io
+
 import numpy as np
+import pandas as pd
 
-# ✅ Load pipeline (Scaler + Model) and label encoder
-pipeline = joblib.load("xgb_pipeline_model.pkl")   # this must be the full pipeline, not just the bare model
-label_encoder = joblib.load("label_encoder.pkl")
+# ✅ Pipeline (Scaler + Model) and label encoder are shared across pages
+from inference import label_encoder, predict_proba, classify_spectrum, spectrum_matrix, wavelength_sweep
+from figures import GRAPH_STYLE, sweep_figure
+from similarity import reference_index
+from validation import validate, clientside_clamp
+import ensemble
+import metrics
 
 dash.register_page(__name__, path="/predict")
 
@@ -15,7 +22,7 @@ layout = html.Div(
         "backgroundImage": "url('/assets/pic2.png')",  # background image
         "backgroundSize": "cover",
         "backgroundPosition": "center",
-        "height": "100vh",
+        "minHeight": "100vh",
         "display": "flex",
         "justifyContent": "center",
         "alignItems": "center",
@@ -102,10 +109,40 @@ layout = html.Div(
                 ], className="mb-3"),
 
                 # 🚀 Predict Button
+                dbc.Switch(id="ensemble-mode-en", label="Ensemble: all six models (soft vote)", value=False,
+                           disabled=not ensemble.available, className="mt-3"),
                 dbc.Button("🚀 Classify Material", id="predict-btn-en", color="primary", className="mt-3 w-100"),
 
                 # Output
                 html.Div(id="prediction-output-en", className="mt-3", style={"textAlign": "center"}),
+
+                # Sweep: hold the other three features fixed, vary wavelength
+                dbc.Button("📉 Sweep Wavelength (300–800 nm)", id="sweep-btn-en", color="secondary", outline=True, className="mt-2 w-100"),
+                html.Div(id="sweep-output-en", className="mt-3"),
+
+                # === Whole-spectrum classification ===
+                html.Hr(className="my-4"),
+                html.H4("📈 Classify a Whole Spectrum", style={"textAlign": "center", "marginBottom": "10px"}),
+                html.P("Upload a CSV sweep with Wavelength, AbsorptionRate, Transmission and OpticalDensity columns (e.g. one material block of TCO.csv).", style={"fontSize": "14px", "color": "#555", "textAlign": "center"}),
+                dcc.Upload(
+                    id="spectrum-upload-en",
+                    children=html.Div("📂 Drag and drop or click to select a spectrum CSV"),
+                    accept=".csv",
+                    style={
+                        "borderWidth": "2px",
+                        "borderStyle": "dashed",
+                        "borderRadius": "10px",
+                        "padding": "20px",
+                        "textAlign": "center",
+                        "cursor": "pointer",
+                    },
+                ),
+                html.Div(id="spectrum-output-en", className="mt-3", style={"textAlign": "center"}),
+                html.Div(
+                    html.A("📦 Score a large file in batch →", href="/batch"),
+                    className="mt-2",
+                    style={"textAlign": "center"},
+                ),
             ]
         )
     ]
@@ -114,93 +151,33 @@ layout = html.Div(
 
 def register_callbacks(app):
     # -------------------------
-    # Client-side callbacks
+    # Client-side callbacks (bounds come from validation.SCHEMA)
     # -------------------------
 
     # Wavelength: clamp 300-800
     app.clientside_callback(
-        """
-        function(val){
-            if (val === null || val === undefined || val === '') {
-                return [null, val];
-            }
-            var num = Number(val);
-            if (isNaN(num)) {
-                return [val, val];
-            }
-            var raw = num;
-            var clamped = num;
-            if (num < 300) clamped = 300;
-            if (num > 800) clamped = 800;
-            return [raw, clamped];
-        }
-        """,
+        clientside_clamp("Wavelength"),
     [Output("raw-wavelength-en", "data"), Output("wavelength-en", "value")],
     [Input("wavelength-en", "value")]
     )
 
     # Absorbance: clamp 0-1
     app.clientside_callback(
-        """
-        function(val){
-            if (val === null || val === undefined || val === '') {
-                return [null, val];
-            }
-            var num = Number(val);
-            if (isNaN(num)) {
-                return [val, val];
-            }
-            var raw = num;
-            var clamped = num;
-            if (num < 0) clamped = 0;
-            if (num > 1) clamped = 1;
-            return [raw, clamped];
-        }
-        """,
+        clientside_clamp("AbsorptionRate"),
     [Output("raw-absorbance-en", "data"), Output("absorbance-en", "value")],
     [Input("absorbance-en", "value")]
     )
 
     # Transmission: clamp 0-100
     app.clientside_callback(
-        """
-        function(val){
-            if (val === null || val === undefined || val === '') {
-                return [null, val];
-            }
-            var num = Number(val);
-            if (isNaN(num)) {
-                return [val, val];
-            }
-            var raw = num;
-            var clamped = num;
-            if (num < 0) clamped = 0;
-            if (num > 100) clamped = 100;
-            return [raw, clamped];
-        }
-        """,
+        clientside_clamp("Transmission"),
     [Output("raw-transmission-en", "data"), Output("transmission-en", "value")],
     [Input("transmission-en", "value")]
     )
 
     # Optical density: clamp 0-100000
     app.clientside_callback(
-        """
-        function(val){
-            if (val === null || val === undefined || val === '') {
-                return [null, val];
-            }
-            var num = Number(val);
-            if (isNaN(num)) {
-                return [val, val];
-            }
-            var raw = num;
-            var clamped = num;
-            if (num < 0) clamped = 0;
-            if (num > 100000) clamped = 100000;
-            return [raw, clamped];
-        }
-        """,
+        clientside_clamp("OpticalDensity"),
     [Output("raw-optical_density-en", "data"), Output("optical_density-en", "value")],
     [Input("optical_density-en", "value")]
     )
@@ -219,11 +196,15 @@ def register_callbacks(app):
     State("raw-absorbance-en", "data"),
     State("raw-transmission-en", "data"),
     State("raw-optical_density-en", "data"),
+    State("ensemble-mode-en", "value"),
         prevent_initial_call=True,
     )
+    @metrics.instrument("predict_material")
     def predict_material(n_clicks,
                          wavelength, absorbance, transmission, optical_density,
-                         raw_wavelength, raw_absorbance, raw_transmission, raw_optical_density):
+                         raw_wavelength, raw_absorbance, raw_transmission, raw_optical_density,
+                         ensemble_mode=False):
+        lap = metrics.stopwatch("predict_material")
         try:
             w = raw_wavelength if raw_wavelength is not None else wavelength
             a = raw_absorbance if raw_absorbance is not None else absorbance
@@ -242,13 +223,21 @@ def register_callbacks(app):
 
             w = float(w); a = float(a); t = float(t); od = float(od)
 
-            input_data = np.array([[w, a, t, od]])
-
-            prediction = pipeline.predict(input_data)[0]
-            material = label_encoder.inverse_transform([prediction])[0]
+            # Server-side check against the same schema the inputs are clamped to
+            input_data, _, issues = validate([[w, a, t, od]], mode="clamp")
+            lap("validation")
 
-            proba = pipeline.predict_proba(input_data)[0]
             classes = label_encoder.classes_
+            if ensemble_mode and ensemble.available:
+                # All members run concurrently; the vote replaces the single model
+                vote, member_probas = ensemble.predict_proba(input_data)
+                proba = vote[0]
+                material = classes[int(np.argmax(proba))]
+            else:
+                member_probas = None
+                proba = predict_proba(input_data)[0]
+                material = classes[int(np.argmax(proba))]
+            lap("inference")
 
             colors = ["primary", "success", "warning", "danger", "info"]
             progress_bars = []
@@ -260,10 +249,115 @@ def register_callbacks(app):
                     ])
                 )
 
-            return html.Div([
+            result = html.Div([
+                dbc.Alert(f"Input outside the valid range: {issues[0]}", color="warning") if issues[0] else None,
                 dbc.Alert(f"Predicted Material: {material}", color="success"),
                 html.H5("Classification Probabilities:", style={"marginTop": "15px"}),
-                html.Div(progress_bars)
+                html.Div(progress_bars),
+                html.Div([
+                    html.H5("Per-Model Probabilities:", style={"marginTop": "15px"}),
+                    dbc.Table(
+                        [html.Thead(html.Tr([html.Th("Model")] + [html.Th(cls) for cls in classes])),
+                         html.Tbody([
+                             # A member with no positive one-vs-rest vote abstains
+                             html.Tr([html.Td(name)] + ([html.Td(f"{q*100:.1f}%") for q in p[0]] if not np.isnan(p[0]).any()
+                                                        else [html.Td("abstained", colSpan=len(classes))]))
+                             for name, p in member_probas.items()
+                         ])],
+                        bordered=True, size="sm",
+                    ),
+                ]) if member_probas else None,
+            ])
+            lap("response")
+            return result
+
+        except Exception as e:
+            return dbc.Alert(f"Error: {str(e)}", color="danger")
+
+    # -------------------------
+    # Whole-spectrum classification (one batched model call per sweep)
+    # -------------------------
+    @app.callback(
+        Output("spectrum-output-en", "children"),
+        Input("spectrum-upload-en", "contents"),
+        prevent_initial_call=True,
+    )
+    @metrics.instrument("classify_uploaded_spectrum")
+    def classify_uploaded_spectrum(contents):
+        try:
+            _, encoded = contents.split(",", 1)
+            frame = pd.read_csv(io.BytesIO(base64.b64decode(encoded)))
+            X = spectrum_matrix(frame)
+            result = classify_spectrum(X)
+            matches = reference_index().query(X[:, 0], X[:, 2], k=3)
+
+            colors = ["primary", "success", "warning", "danger", "info"]
+            progress_bars = []
+            for i, (cls, p) in enumerate(zip(label_encoder.classes_, result["posterior"])):
+                progress_bars.append(
+                    html.Div([
+                        html.Strong(f"{cls}: {p*100:.2f}%"),
+                        dbc.Progress(value=p*100, color=colors[i % len(colors)], className="mb-3")
+                    ])
+                )
+
+            band_rows = [
+                html.Tr([html.Td(f"{lo}–{hi}"), html.Td(n), html.Td(f"{agree*100:.1f}%")])
+                for lo, hi, n, agree in result["bands"]
+            ]
+
+            return html.Div([
+                dbc.Alert(f"Predicted Material: {result['material']} ({result['confidence']*100:.2f}% confidence, {result['n_points']} points)", color="success"),
+                html.H5("Spectrum Probabilities:", style={"marginTop": "15px"}),
+                html.Div(progress_bars),
+                html.H5("Agreement per Wavelength Band:", style={"marginTop": "15px"}),
+                dbc.Table(
+                    [html.Thead(html.Tr([html.Th(h) for h in ["Band (nm)", "Points", "Agreement"]])), html.Tbody(band_rows)],
+                    bordered=True, size="sm",
+                ),
+                html.H5("Closest Reference Spectra (Transmission):", style={"marginTop": "15px"}),
+                html.Ul(
+                    [html.Li(f"{label}: cosine distance {dist:.4f}") for label, dist in matches],
+                    style={"listStyle": "none", "padding": "0"},
+                ),
+            ])
+
+        except Exception as e:
+            return dbc.Alert(f"Error: {str(e)}", color="danger")
+
+    # -------------------------
+    # Wavelength sweep (one vectorized call over the 300-800 nm grid)
+    # -------------------------
+    @app.callback(
+        Output("sweep-output-en", "children"),
+        Input("sweep-btn-en", "n_clicks"),
+        State("absorbance-en", "value"),
+        State("transmission-en", "value"),
+        State("optical_density-en", "value"),
+        State("raw-absorbance-en", "data"),
+        State("raw-transmission-en", "data"),
+        State("raw-optical_density-en", "data"),
+        prevent_initial_call=True,
+    )
+    @metrics.instrument("sweep_wavelength")
+    def sweep_wavelength(n_clicks, absorbance, transmission, optical_density,
+                         raw_absorbance, raw_transmission, raw_optical_density):
+        try:
+            a = raw_absorbance if raw_absorbance is not None else absorbance
+            t = raw_transmission if raw_transmission is not None else transmission
+            od = raw_optical_density if raw_optical_density is not None else optical_density
+
+            missing = [name for name, val in [("Absorbance", a), ("Transmission (%)", t), ("Optical Density", od)] if val in (None, "")]
+            if missing:
+                return dbc.Alert(f"Please enter valid value for: {', '.join(missing)}", color="danger")
+
+            X, _, issues = validate([[float(a), float(t), float(od)]], ["AbsorptionRate", "Transmission", "OpticalDensity"], mode="clamp")
+            a, t, od = X[0]
+            grid, proba = wavelength_sweep(a, t, od)
+            fig = sweep_figure(grid, proba, f"Class probability vs wavelength (A={a:g}, T={t:g}%, OD={od:g})", "Wavelength (nm)", "Probability")
+            return html.Div([
+                dbc.Alert(f"Input outside the valid range: {issues[0]}", color="warning") if issues[0] else None,
+                dcc.Graph(figure=fig, style=GRAPH_STYLE, config={"displayModeBar": False}),
             ])
 
         except Exception as e:
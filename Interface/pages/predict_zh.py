@@ -1,11 +1,18 @@
 import dash
 from dash import html, dcc, Input, Output, State
 import dash_bootstrap_components as dbc
-import joblib
+import base64
+import io
+
 import numpy as np
+import pandas as pd
 
-pipeline = joblib.load("xgb_pipeline_model.pkl")
-label_encoder = joblib.load("label_encoder.pkl")
+from inference import label_encoder, predict_proba, classify_spectrum, spectrum_matrix, wavelength_sweep
+from figures import GRAPH_STYLE, sweep_figure
+from similarity import reference_index
+from validation import validate, clientside_clamp
+import ensemble
+import metrics
 
 dash.register_page(__name__, path="/predict-zh")
 
@@ -14,7 +21,7 @@ layout = html.Div(
         "backgroundImage": "url('/assets/pic2.png')",
         "backgroundSize": "cover",
         "backgroundPosition": "center",
-        "height": "100vh",
+        "minHeight": "100vh",
         "display": "flex",
         "justifyContent": "center",
         "alignItems": "center",
@@ -83,8 +90,38 @@ layout = html.Div(
                     dbc.Input(id="optical_density-zh", type="number", min=0, max=100000, step="any", placeholder="输入光密度"),
                     dbc.InputGroupText("0–100000"),
                 ], className="mb-3"),
+                dbc.Switch(id="ensemble-mode-zh", label="集成模式：六个模型软投票", value=False,
+                           disabled=not ensemble.available, className="mt-3"),
                 dbc.Button("🚀 分类材料", id="predict-btn-zh", color="primary", className="mt-3 w-100"),
                 html.Div(id="prediction-output-zh", className="mt-3", style={"textAlign": "center"}),
+
+                # Sweep: hold the other three features fixed, vary wavelength
+                dbc.Button("📉 波长扫描 (300–800 nm)", id="sweep-btn-zh", color="secondary", outline=True, className="mt-2 w-100"),
+                html.Div(id="sweep-output-zh", className="mt-3"),
+
+                # === Whole-spectrum classification ===
+                html.Hr(className="my-4"),
+                html.H4("📈 整条光谱分类", style={"textAlign": "center", "marginBottom": "10px"}),
+                html.P("上传包含 Wavelength、AbsorptionRate、Transmission 和 OpticalDensity 列的光谱 CSV（例如 TCO.csv 中的一种材料）。", style={"fontSize": "14px", "color": "#555", "textAlign": "center"}),
+                dcc.Upload(
+                    id="spectrum-upload-zh",
+                    children=html.Div("📂 拖放或点击选择光谱 CSV 文件"),
+                    accept=".csv",
+                    style={
+                        "borderWidth": "2px",
+                        "borderStyle": "dashed",
+                        "borderRadius": "10px",
+                        "padding": "20px",
+                        "textAlign": "center",
+                        "cursor": "pointer",
+                    },
+                ),
+                html.Div(id="spectrum-output-zh", className="mt-3", style={"textAlign": "center"}),
+                html.Div(
+                    html.A("📦 批量评分大型文件 →", href="/batch-zh"),
+                    className="mt-2",
+                    style={"textAlign": "center"},
+                ),
             ]
         )
     ]
@@ -92,85 +129,25 @@ layout = html.Div(
 
 def register_callbacks(app):
     # -------------------------
-    # Client-side callbacks
+    # Client-side callbacks (bounds come from validation.SCHEMA)
     # -------------------------
     app.clientside_callback(
-        """
-        function(val){
-            if (val === null || val === undefined || val === '') {
-                return [null, val];
-            }
-            var num = Number(val);
-            if (isNaN(num)) {
-                return [val, val];
-            }
-            var raw = num;
-            var clamped = num;
-            if (num < 300) clamped = 300;
-            if (num > 800) clamped = 800;
-            return [raw, clamped];
-        }
-        """,
+        clientside_clamp("Wavelength"),
     [Output("raw-wavelength-zh", "data"), Output("wavelength-zh", "value")],
     [Input("wavelength-zh", "value")]
     )
     app.clientside_callback(
-        """
-        function(val){
-            if (val === null || val === undefined || val === '') {
-                return [null, val];
-            }
-            var num = Number(val);
-            if (isNaN(num)) {
-                return [val, val];
-            }
-            var raw = num;
-            var clamped = num;
-            if (num < 0) clamped = 0;
-            if (num > 1) clamped = 1;
-            return [raw, clamped];
-        }
-        """,
+        clientside_clamp("AbsorptionRate"),
     [Output("raw-absorbance-zh", "data"), Output("absorbance-zh", "value")],
     [Input("absorbance-zh", "value")]
     )
     app.clientside_callback(
-        """
-        function(val){
-            if (val === null || val === undefined || val === '') {
-                return [null, val];
-            }
-            var num = Number(val);
-            if (isNaN(num)) {
-                return [val, val];
-            }
-            var raw = num;
-            var clamped = num;
-            if (num < 0) clamped = 0;
-            if (num > 100) clamped = 100;
-            return [raw, clamped];
-        }
-        """,
+        clientside_clamp("Transmission"),
     [Output("raw-transmission-zh", "data"), Output("transmission-zh", "value")],
     [Input("transmission-zh", "value")]
     )
     app.clientside_callback(
-        """
-        function(val){
-            if (val === null || val === undefined || val === '') {
-                return [null, val];
-            }
-            var num = Number(val);
-            if (isNaN(num)) {
-                return [val, val];
-            }
-            var raw = num;
-            var clamped = num;
-            if (num < 0) clamped = 0;
-            if (num > 100000) clamped = 100000;
-            return [raw, clamped];
-        }
-        """,
+        clientside_clamp("OpticalDensity"),
     [Output("raw-optical_density-zh", "data"), Output("optical_density-zh", "value")],
     [Input("optical_density-zh", "value")]
     )
@@ -189,11 +166,15 @@ def register_callbacks(app):
     State("raw-absorbance-zh", "data"),
     State("raw-transmission-zh", "data"),
     State("raw-optical_density-zh", "data"),
+    State("ensemble-mode-zh", "value"),
         prevent_initial_call=True,
     )
+    @metrics.instrument("predict_material")
     def predict_material(n_clicks,
                          wavelength, absorbance, transmission, optical_density,
-                         raw_wavelength, raw_absorbance, raw_transmission, raw_optical_density):
+                         raw_wavelength, raw_absorbance, raw_transmission, raw_optical_density,
+                         ensemble_mode=False):
+        lap = metrics.stopwatch("predict_material")
         try:
             w = raw_wavelength if raw_wavelength is not None else wavelength
             a = raw_absorbance if raw_absorbance is not None else absorbance
@@ -212,13 +193,21 @@ def register_callbacks(app):
 
             w = float(w); a = float(a); t = float(t); od = float(od)
 
-            input_data = np.array([[w, a, t, od]])
-
-            prediction = pipeline.predict(input_data)[0]
-            material = label_encoder.inverse_transform([prediction])[0]
+            # Server-side check against the same schema the inputs are clamped to
+            input_data, _, issues = validate([[w, a, t, od]], mode="clamp")
+            lap("validation")
 
-            proba = pipeline.predict_proba(input_data)[0]
             classes = label_encoder.classes_
+            if ensemble_mode and ensemble.available:
+                # All members run concurrently; the vote replaces the single model
+                vote, member_probas = ensemble.predict_proba(input_data)
+                proba = vote[0]
+                material = classes[int(np.argmax(proba))]
+            else:
+                member_probas = None
+                proba = predict_proba(input_data)[0]
+                material = classes[int(np.argmax(proba))]
+            lap("inference")
 
             colors = ["primary", "success", "warning", "danger", "info"]
             progress_bars = []
@@ -230,11 +219,116 @@ def register_callbacks(app):
                     ])
                 )
 
-            return html.Div([
+            result = html.Div([
+                dbc.Alert(f"输入超出有效范围: {issues[0]}", color="warning") if issues[0] else None,
                 dbc.Alert(f"预测材料: {material}", color="success"),
                 html.H5("分类概率:", style={"marginTop": "15px"}),
-                html.Div(progress_bars)
+                html.Div(progress_bars),
+                html.Div([
+                    html.H5("各模型概率:", style={"marginTop": "15px"}),
+                    dbc.Table(
+                        [html.Thead(html.Tr([html.Th("模型")] + [html.Th(cls) for cls in classes])),
+                         html.Tbody([
+                             # A member with no positive one-vs-rest vote abstains
+                             html.Tr([html.Td(name)] + ([html.Td(f"{q*100:.1f}%") for q in p[0]] if not np.isnan(p[0]).any()
+                                                        else [html.Td("弃权", colSpan=len(classes))]))
+                             for name, p in member_probas.items()
+                         ])],
+                        bordered=True, size="sm",
+                    ),
+                ]) if member_probas else None,
+            ])
+            lap("response")
+            return result
+
+        except Exception as e:
+            return dbc.Alert(f"错误: {str(e)}", color="danger")
+
+    # -------------------------
+    # Whole-spectrum classification (one batched model call per sweep)
+    # -------------------------
+    @app.callback(
+        Output("spectrum-output-zh", "children"),
+        Input("spectrum-upload-zh", "contents"),
+        prevent_initial_call=True,
+    )
+    @metrics.instrument("classify_uploaded_spectrum")
+    def classify_uploaded_spectrum(contents):
+        try:
+            _, encoded = contents.split(",", 1)
+            frame = pd.read_csv(io.BytesIO(base64.b64decode(encoded)))
+            X = spectrum_matrix(frame)
+            result = classify_spectrum(X)
+            matches = reference_index().query(X[:, 0], X[:, 2], k=3)
+
+            colors = ["primary", "success", "warning", "danger", "info"]
+            progress_bars = []
+            for i, (cls, p) in enumerate(zip(label_encoder.classes_, result["posterior"])):
+                progress_bars.append(
+                    html.Div([
+                        html.Strong(f"{cls}: {p*100:.2f}%"),
+                        dbc.Progress(value=p*100, color=colors[i % len(colors)], className="mb-3")
+                    ])
+                )
+
+            band_rows = [
+                html.Tr([html.Td(f"{lo}–{hi}"), html.Td(n), html.Td(f"{agree*100:.1f}%")])
+                for lo, hi, n, agree in result["bands"]
+            ]
+
+            return html.Div([
+                dbc.Alert(f"预测材料: {result['material']}（置信度 {result['confidence']*100:.2f}%，共 {result['n_points']} 个点）", color="success"),
+                html.H5("光谱分类概率:", style={"marginTop": "15px"}),
+                html.Div(progress_bars),
+                html.H5("各波段一致率:", style={"marginTop": "15px"}),
+                dbc.Table(
+                    [html.Thead(html.Tr([html.Th(h) for h in ["波段 (nm)", "点数", "一致率"]])), html.Tbody(band_rows)],
+                    bordered=True, size="sm",
+                ),
+                html.H5("最相似的参考光谱（透射率）:", style={"marginTop": "15px"}),
+                html.Ul(
+                    [html.Li(f"{label}: 余弦距离 {dist:.4f}") for label, dist in matches],
+                    style={"listStyle": "none", "padding": "0"},
+                ),
+            ])
+
+        except Exception as e:
+            return dbc.Alert(f"错误: {str(e)}", color="danger")
+
+    # -------------------------
+    # Wavelength sweep (one vectorized call over the 300-800 nm grid)
+    # -------------------------
+    @app.callback(
+        Output("sweep-output-zh", "children"),
+        Input("sweep-btn-zh", "n_clicks"),
+        State("absorbance-zh", "value"),
+        State("transmission-zh", "value"),
+        State("optical_density-zh", "value"),
+        State("raw-absorbance-zh", "data"),
+        State("raw-transmission-zh", "data"),
+        State("raw-optical_density-zh", "data"),
+        prevent_initial_call=True,
+    )
+    @metrics.instrument("sweep_wavelength")
+    def sweep_wavelength(n_clicks, absorbance, transmission, optical_density,
+                         raw_absorbance, raw_transmission, raw_optical_density):
+        try:
+            a = raw_absorbance if raw_absorbance is not None else absorbance
+            t = raw_transmission if raw_transmission is not None else transmission
+            od = raw_optical_density if raw_optical_density is not None else optical_density
+
+            missing = [name for name, val in [("吸光度", a), ("透射率 (%)", t), ("光密度", od)] if val in (None, "")]
+            if missing:
+                return dbc.Alert(f"请输入有效的值用于: {', '.join(missing)}", color="danger")
+
+            X, _, issues = validate([[float(a), float(t), float(od)]], ["AbsorptionRate", "Transmission", "OpticalDensity"], mode="clamp")
+            a, t, od = X[0]
+            grid, proba = wavelength_sweep(a, t, od)
+            fig = sweep_figure(grid, proba, f"分类概率与波长关系 (A={a:g}, T={t:g}%, OD={od:g})", "波长 (nm)", "概率")
+            return html.Div([
+                dbc.Alert(f"输入超出有效范围: {issues[0]}", color="warning") if issues[0] else None,
+                dcc.Graph(figure=fig, style=GRAPH_STYLE, config={"displayModeBar": False}),
             ])
 
         except Exception as e:
-            return dbc.Alert(f"错误: {str(e)}", color="danger")
\ No newline at end of file
+            return dbc.Alert(f"错误: {str(e)}", color="danger")
@@ -1,13 +1,25 @@
 import dash
-from dash import html, dcc, Input, Output, State
+from dash import html, dcc, Input, Output, State, Patch, no_update
 import dash_bootstrap_components as dbc
-import pandas as pd
-import plotly.express as px
+
+import decision_surface
+import inference
+import metrics
+import spectra
+from figures import (
+    DEFAULT_RANGE, GRAPH_STYLE, HIDDEN_GRAPH_STYLE, MAX_POINTS,
+    base_transmission_figure, comparison_figure, patch_overlay, surface_figure, transmission_view,
+)
 
 dash.register_page(__name__, path="/visualize-zh")
 
-# === Load dataset ===
-df = pd.read_csv("TCO.csv")
+PROPERTY_LABELS = {
+    "AbsorptionRate": "吸光度",
+    "Transmission": "透射率 (%)",
+    "OpticalDensity": "光密度",
+}
+SURFACES = decision_surface.available_surfaces()
+AXIS_LABELS = {"Wavelength": "波长 (nm)", **PROPERTY_LABELS}
 
 # === Layout ===
 layout = html.Div(
@@ -87,7 +99,7 @@ layout = html.Div(
                     dbc.InputGroupText("🧩 材料"),
                     dcc.Dropdown(
                         id="material-dropdown",
-                        options=[{"label": m, "value": m} for m in df["Material"].unique()],
+                        options=[{"label": m, "value": m} for m in spectra.materials()],
                         placeholder="请选择一种材料",
                         style={"width": "100%"},
                     ),
@@ -102,13 +114,20 @@ layout = html.Div(
                     min=300,
                     max=800,
                     step=1,
-                    value=[400, 700],
+                    value=list(DEFAULT_RANGE),
                     marks={300: '300', 800: '800'},
                     tooltip={"placement": "bottom", "always_visible": True},
                     allowCross=False,
                     className="custom-range-slider",
                 ),
 
+                dbc.Switch(
+                    id="prediction-overlay-zh",
+                    label="🎯 显示模型预测",
+                    value=False,
+                    className="mt-4",
+                ),
+
                 dbc.Button(
                     "🎨 显示图表",
                     id="show-graph-btn",
@@ -117,86 +136,244 @@ layout = html.Div(
                     style={"fontWeight": "600"},
                 ),
 
-                html.Div(id="transmission-graph-container-zh", className="mt-4"),
+                # Persistent graph: callbacks patch its data/ranges instead of re-mounting it;
+                # the store remembers which material/range it currently shows
+                dcc.Store(id="transmission-graph-material-zh"),
+                html.Div(id="transmission-graph-message-zh", className="mt-4"),
+                dcc.Graph(
+                    id="transmission-graph-zh",
+                    figure=base_transmission_figure("波长 (nm)", "透射率 (%)", "预测"),
+                    style=HIDDEN_GRAPH_STYLE,
+                    config={"displayModeBar": False}
+                ),
+                html.Div(id="transmission-stats-zh", className="mt-3"),
+
+                # === Comparison mode: overlay any subset of materials/properties ===
+                html.Hr(className="my-4"),
+                html.H4(
+                    "🔀 材料对比",
+                    style={"textAlign": "center", "marginBottom": "20px", "fontWeight": "600", "color": "#1F2937"},
+                ),
+                dbc.InputGroup([
+                    dbc.InputGroupText("🧩 材料"),
+                    dcc.Dropdown(
+                        id="compare-materials-zh",
+                        options=[{"label": m, "value": m} for m in spectra.materials()],
+                        multi=True,
+                        placeholder="选择要叠加的材料",
+                        style={"flex": "1"},
+                    ),
+                ], className="mb-3"),
+                dbc.InputGroup([
+                    dbc.InputGroupText("📊 性质"),
+                    dcc.Dropdown(
+                        id="compare-properties-zh",
+                        options=[{"label": label, "value": prop} for prop, label in PROPERTY_LABELS.items()],
+                        value=["Transmission"],
+                        multi=True,
+                        placeholder="选择性质",
+                        style={"flex": "1"},
+                    ),
+                ], className="mb-3"),
+                dbc.Button(
+                    "📈 对比",
+                    id="compare-btn-zh",
+                    color="primary",
+                    className="w-100",
+                    style={"fontWeight": "600"},
+                ),
+                html.Div(id="compare-graph-message-zh", className="mt-4"),
+                dcc.Graph(
+                    id="compare-graph-zh",
+                    style=HIDDEN_GRAPH_STYLE,
+                    config={"displayModeBar": False}
+                ),
+
+                # === Decision boundaries: precomputed rasters, no inference here ===
+                html.Hr(className="my-4"),
+                html.H4(
+                    "🗺️ 决策边界",
+                    style={"textAlign": "center", "marginBottom": "10px", "fontWeight": "600", "color": "#1F2937"},
+                ),
+                html.P("已部署模型在两个特征上的预计算分类图，其余两个特征取数据集中位数。圆点为参考测量数据。", style={"fontSize": "14px", "color": "#555", "textAlign": "center"}),
+                dbc.InputGroup([
+                    dbc.InputGroupText("🧭 特征"),
+                    dcc.Dropdown(
+                        id="surface-dropdown-zh",
+                        options=[
+                            {"label": " × ".join(AXIS_LABELS[f] for f in name.split("__")), "value": name}
+                            for name in SURFACES
+                        ],
+                        value=SURFACES[0] if SURFACES else None,
+                        clearable=False,
+                        style={"flex": "1"},
+                    ),
+                ], className="mb-3"),
+                dbc.RadioItems(
+                    id="surface-view-zh",
+                    options=[
+                        {"label": "预测类别", "value": "class"},
+                        {"label": "置信度", "value": "confidence"},
+                    ],
+                    value="class",
+                    inline=True,
+                    className="mb-3",
+                ),
+                html.Div(id="surface-graph-container-zh"),
             ],
         )
     ]
 )
 
+def stats_table(material):
+    stats = spectra.summary_stats(material)
+    rows = [
+        html.Tr([html.Td(PROPERTY_LABELS[prop])] + [
+            html.Td(f"{stats[prop][key]:.4g}") for key in ("min", "mean", "max")
+        ])
+        for prop in spectra.PROPERTIES
+    ]
+    return html.Div([
+        dbc.Table(
+            [html.Thead(html.Tr([html.Th(h) for h in ["性质", "最小值", "平均值", "最大值"]])), html.Tbody(rows)],
+            bordered=True, size="sm", className="mb-1",
+        ),
+        html.Small(f"最大透射率位于 {stats['PeakWavelength']:.0f} nm", style={"color": "#555"}),
+    ])
+
+
 # === Callback ===
 @dash.callback(
-    Output("transmission-graph-container-zh", "children"),
+    Output("transmission-graph-zh", "figure"),
+    Output("transmission-graph-zh", "style"),
+    Output("transmission-graph-message-zh", "children"),
+    Output("transmission-graph-material-zh", "data"),
+    Output("transmission-stats-zh", "children"),
     Input("show-graph-btn", "n_clicks"),
     State("material-dropdown", "value"),
     State("range-slider", "value"),
+    State("transmission-graph-material-zh", "data"),
+    State("prediction-overlay-zh", "value"),
     prevent_initial_call=True
 )
-def update_graph(n_clicks, material, range_values):
+@metrics.instrument("update_graph")
+def update_graph(n_clicks, material, range_values, shown, overlay=False):
+    lap = metrics.stopwatch("update_graph")
     if not material:
-        return dbc.Alert("⚠️ 请在显示图表之前选择一种材料。", color="warning")
+        alert = dbc.Alert("⚠️ 请在显示图表之前选择一种材料。", color="warning")
+        return no_update, HIDDEN_GRAPH_STYLE, alert, no_update, None
 
-    subset = df[df["Material"] == material]
-    filtered = subset[
-        (subset["Wavelength"] >= range_values[0]) &
-        (subset["Wavelength"] <= range_values[1])
-    ]
+    lo, hi = range_values
+    lap("validation")
+    view = transmission_view(material, lo, hi)
 
-    if filtered.empty:
-        return dbc.Alert("所选范围内无可用数据。", color="danger")
-
-    # --- Create smooth line with filled area ---
-    fig = px.area(
-        filtered,
-        x="Wavelength",
-        y="Transmission",
-        title=f"透射率与波长关系图： {material} ({range_values[0]}–{range_values[1]} nm)",
-        template="plotly_white",
-    )
-
-    # --- Aesthetic enhancements ---
-    fig.update_traces(
-        line=dict(color="#007BFF", width=3),
-        fill="tozeroy",
-        fillcolor="rgba(0, 123, 255, 0.15)"
-    )
-
-    fig.update_layout(
-        title_x=0.5,
-        title_font=dict(size=22, family="Poppins, Segoe UI, sans-serif", color="#1F2937"),
-        xaxis_title="波长 (nm)",
-        yaxis_title="透射率 (%)",
-        xaxis=dict(
-            title_font=dict(size=16, family="Poppins, Segoe UI, sans-serif"),
-            tickfont=dict(size=12, family="Poppins, Segoe UI, sans-serif"),
-            showgrid=False,
-            zeroline=False
-        ),
-        yaxis=dict(
-            title_font=dict(size=16, family="Poppins, Segoe UI, sans-serif"),
-            tickfont=dict(size=12, family="Poppins, Segoe UI, sans-serif"),
-            showgrid=False,
-            zeroline=False
-        ),
-        margin=dict(l=50, r=50, t=70, b=60),
-        height=500,
-        plot_bgcolor="white",   # white top area
-        paper_bgcolor="white",
-        hovermode="x unified",
-        hoverlabel=dict(
-            bgcolor="white",
-            font_size=13,
-            font_family="Poppins, Segoe UI, sans-serif"
-        ),
-        showlegend=False,
-        transition_duration=600,
-    )
-
-    return dcc.Graph(
-        figure=fig,
-        style={
-            "borderRadius": "10px",
-            "boxShadow": "0px 4px 15px rgba(0, 0, 0, 0.1)",
-            "backgroundColor": "white",
-        },
-        config={"displayModeBar": False}
-    )
+    if view is None:
+        alert = dbc.Alert("所选范围内无可用数据。", color="danger")
+        return no_update, HIDDEN_GRAPH_STYLE, alert, no_update, None
+
+    # --- Send only what changed: the curve when the material changes (or,
+    # for dense curves, the downsampled window), ranges always ---
+    patched = Patch()
+    if view["windowed"] or material != (shown or {}).get("material"):
+        patched["data"][0]["x"] = view["x"]
+        patched["data"][0]["y"] = view["y"]
+    patched["layout"]["title"]["text"] = f"透射率与波长关系图： {material} ({range_values[0]}–{range_values[1]} nm)"
+    patched["layout"]["xaxis"]["range"] = [lo, hi]
+    patched["layout"]["yaxis"]["range"] = view["y_range"]
+    lap("response")
+    # Overlay markers come from the cached per-material batch predictions; a
+    # cache miss is timed by inference.predict_proba itself
+    patch_overlay(patched, material, lo, hi, overlay)
+    lap("overlay")
+
+    shown = {"material": material, "range": [lo, hi]}
+    return patched, GRAPH_STYLE, None, shown, stats_table(material)
+
+
+# === Zoom: fetch more detail for the visible window ===
+@dash.callback(
+    Output("transmission-graph-zh", "figure", allow_duplicate=True),
+    Input("transmission-graph-zh", "relayoutData"),
+    State("transmission-graph-material-zh", "data"),
+    State("prediction-overlay-zh", "value"),
+    prevent_initial_call=True
+)
+@metrics.instrument("zoom_graph")
+def zoom_graph(relayout, shown, overlay):
+    if not shown or not relayout:
+        return no_update
+    material = shown["material"]
+    if len(spectra.curve(material)["Wavelength"]) <= MAX_POINTS:
+        return no_update
+
+    if "xaxis.range[0]" in relayout:
+        lo, hi = relayout["xaxis.range[0]"], relayout["xaxis.range[1]"]
+    elif relayout.get("xaxis.autorange"):
+        lo, hi = shown["range"]
+    else:
+        return no_update
+
+    _, x, y = spectra.window_points(material, "Transmission", lo, hi, MAX_POINTS)
+    patched = Patch()
+    patched["data"][0]["x"] = x.tolist()
+    patched["data"][0]["y"] = y.tolist()
+    return patch_overlay(patched, material, lo, hi, overlay)
+
+
+
+# === Prediction overlay toggle: only the overlay traces are patched ===
+@dash.callback(
+    Output("transmission-graph-zh", "figure", allow_duplicate=True),
+    Input("prediction-overlay-zh", "value"),
+    State("transmission-graph-material-zh", "data"),
+    prevent_initial_call=True
+)
+def toggle_overlay(overlay, shown):
+    if not shown:
+        return no_update
+    lo, hi = shown["range"]
+    return patch_overlay(Patch(), shown["material"], lo, hi, overlay)
+
+
+# === Comparison overlay ===
+@dash.callback(
+    Output("compare-graph-zh", "figure"),
+    Output("compare-graph-zh", "style"),
+    Output("compare-graph-message-zh", "children"),
+    Input("compare-btn-zh", "n_clicks"),
+    State("compare-materials-zh", "value"),
+    State("compare-properties-zh", "value"),
+    State("range-slider", "value"),
+    prevent_initial_call=True
+)
+@metrics.instrument("compare_materials")
+def compare_materials(n_clicks, materials, properties, range_values):
+    if not materials or not properties:
+        alert = dbc.Alert("⚠️ 请至少选择一种材料和一种性质进行对比。", color="warning")
+        return no_update, HIDDEN_GRAPH_STYLE, alert
+
+    # Canonical ordering so equivalent selections share a figure-cache entry
+    materials = tuple(m for m in spectra.materials() if m in materials)
+    properties = tuple(p for p in PROPERTY_LABELS if p in properties)
+    fig = comparison_figure(materials, properties, range_values[0], range_values[1],
+                            tuple(PROPERTY_LABELS.items()), "波长 (nm)")
+    return fig, GRAPH_STYLE, None
+
+
+# === Decision boundary heatmap ===
+@dash.callback(
+    Output("surface-graph-container-zh", "children"),
+    Input("surface-dropdown-zh", "value"),
+    Input("surface-view-zh", "value"),
+)
+def show_surface(name, view):
+    if not name:
+        return dbc.Alert("未找到决策面文件，请运行 decision_surface.py。", color="secondary")
+
+    surface = decision_surface.load_surface(name)
+    if not decision_surface.is_current(surface):
+        return dbc.Alert(f"决策面已过期：它基于模型 {surface.get('model_version', '未知')} 计算，"
+                         f"而当前部署的是模型 {inference.MODEL_VERSION}。请重新运行 decision_surface.py。", color="warning")
+    fig = surface_figure(surface, view, AXIS_LABELS, "置信度",
+                         decision_surface.LOG_FEATURES)
+    return dcc.Graph(figure=fig, style=GRAPH_STYLE, config={"displayModeBar": False})
@@ -0,0 +1,142 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+import xgboost as xgb
+
+# === Portable model artifacts ===
+# A StandardScaler + OneVsRestClassifier(XGBClassifier) pipeline exported as a
+# directory: one XGBoost booster per class in XGBoost's native UBJSON format
+# plus model.json with the feature names, class labels, scaler mean/scale and
+# a SHA-256 checksum over all of it. Loading needs NumPy and XGBoost only (no
+# sklearn objects are unpickled), so the artifact survives library upgrades
+# and starts faster than the pickled pipeline.
+#
+#   python portable.py export xgb_pipeline_model.pkl label_encoder.pkl xgb_portable
+#   python portable.py verify xgb_portable
+MANIFEST_NAME = "model.json"
+FORMAT = "tco-portable"
+FORMAT_VERSION = 1
+
+
+def _checksum(manifest, directory):
+    # Over the manifest (minus the checksum itself) and every booster file
+    digest = hashlib.sha256()
+    body = {k: v for k, v in manifest.items() if k != "checksum"}
+    digest.update(json.dumps(body, sort_keys=True).encode())
+    for member in manifest["boosters"]:
+        with open(os.path.join(directory, member["file"]), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def export(pipeline, classes, directory, features=None):
+    *head, (_, ovr) = pipeline.steps
+    scaler = head[0][1] if head else None
+    if not all(hasattr(e, "get_booster") for e in getattr(ovr, "estimators_", [None])):
+        raise ValueError("Only one-vs-rest XGBoost pipelines can be exported")
+    n_features = ovr.estimators_[0].n_features_in_
+    features = features if features is not None else getattr(pipeline, "feature_names_in_", range(n_features))
+    os.makedirs(directory, exist_ok=True)
+
+    boosters = []
+    for i, estimator in enumerate(ovr.estimators_):
+        file = f"booster_{i}.ubj"
+        estimator.get_booster().save_model(os.path.join(directory, file))
+        boosters.append({"file": file, "class": str(classes[i])})
+    manifest = {
+        "format": FORMAT,
+        "format_version": FORMAT_VERSION,
+        "features": [str(f) for f in features],
+        "classes": [str(c) for c in classes],
+        "scaler": {
+            "mean": (scaler.mean_ if scaler is not None else np.zeros(n_features)).tolist(),
+            "scale": (scaler.scale_ if scaler is not None else np.ones(n_features)).tolist(),
+        },
+        "boosters": boosters,
+    }
+    manifest["checksum"] = _checksum(manifest, directory)
+    with open(os.path.join(directory, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+class Labels:
+    # The part of LabelEncoder the Interface uses, without sklearn
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes)
+
+    def inverse_transform(self, y):
+        return self.classes_[np.asarray(y, dtype=np.int64)]
+
+
+class PortableModel:
+    def __init__(self, manifest, boosters):
+        self.manifest = manifest
+        self.boosters = boosters
+        self.features = manifest["features"]
+        self.classes = manifest["classes"]
+        self.checksum = manifest["checksum"]
+        self.mean = np.asarray(manifest["scaler"]["mean"], dtype=np.float64)
+        self.scale = np.asarray(manifest["scaler"]["scale"], dtype=np.float64)
+
+    def predict_proba(self, X):
+        X = (np.asarray(X, dtype=np.float64) - self.mean) / self.scale
+        proba = np.column_stack([b.inplace_predict(X) for b in self.boosters]) if len(X) else np.empty((0, len(self.boosters)))
+        # Same normalization as OneVsRestClassifier.predict_proba
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return proba / proba.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        return self.predict_proba(X).argmax(axis=1)
+
+
+def load(directory, verify=True):
+    with open(os.path.join(directory, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT or manifest.get("format_version", 0) > FORMAT_VERSION:
+        raise ValueError(f"{directory} is not a {FORMAT} v{FORMAT_VERSION} artifact")
+    if verify and _checksum(manifest, directory) != manifest["checksum"]:
+        raise ValueError(f"Checksum mismatch in {directory}; the artifact is incomplete or was modified")
+    boosters = []
+    for member in manifest["boosters"]:
+        booster = xgb.Booster()
+        booster.load_model(os.path.join(directory, member["file"]))
+        boosters.append(booster)
+    return PortableModel(manifest, boosters)
+
+
+def is_portable(path):
+    return os.path.isfile(os.path.join(path, MANIFEST_NAME))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export or verify a portable model artifact.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    exporter = commands.add_parser("export", help="pickled pipeline + label encoder -> portable directory")
+    exporter.add_argument("model")
+    exporter.add_argument("encoder")
+    exporter.add_argument("directory")
+    verifier = commands.add_parser("verify", help="check a portable directory's checksum and load it")
+    verifier.add_argument("directory")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        import joblib
+        manifest = export(joblib.load(args.model), joblib.load(args.encoder).classes_, args.directory)
+        print(f"✅ Exported {len(manifest['boosters'])} boosters to '{args.directory}' (checksum {manifest['checksum'][:12]})")
+        return 0
+    try:
+        model = load(args.directory)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"✅ '{args.directory}' is intact: {len(model.boosters)} boosters, classes {', '.join(model.classes)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+import hmac
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+
+from flask import g, request
+
+# === On-demand request profiling ===
+# A sampled fraction of Dash callbacks and /api requests (or any request with
+# the admin header) runs under a statistical profiler: a side thread samples
+# the request thread's stack every few milliseconds. Each profile is written in
+# folded-stack format ("frame;frame;frame count"), which flamegraph.pl,
+# speedscope and inferno read directly. Off unless configured:
+#   TCO_PROFILE=0.01            profile 1% of requests
+#   TCO_PROFILE_TOKEN=<secret>  profile any request sent with X-TCO-Profile: <secret>
+#   TCO_PROFILE_DIR, TCO_PROFILE_KEEP (newest files kept), TCO_PROFILE_INTERVAL_MS
+SAMPLE_RATE = float(os.environ.get("TCO_PROFILE", "0") or 0)
+TOKEN = os.environ.get("TCO_PROFILE_TOKEN", "")
+HEADER = "X-TCO-Profile"
+PROFILE_DIR = os.environ.get("TCO_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "tco-profiles"))
+KEEP = int(os.environ.get("TCO_PROFILE_KEEP", "200"))
+INTERVAL = float(os.environ.get("TCO_PROFILE_INTERVAL_MS", "2")) / 1000
+
+_write_lock = threading.Lock()
+
+
+class Sampler:
+    # Samples one thread's stack until stopped; counts identical stacks
+    def __init__(self, thread_id, interval=INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="tco-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+
+def write_folded(stacks, name):
+    # One file per profile; only the newest KEEP files are retained
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}-{name}.folded")
+    with open(path, "w") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+    with _write_lock:
+        files = sorted(
+            (entry for entry in os.scandir(PROFILE_DIR) if entry.name.endswith(".folded")),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in files[:max(len(files) - KEEP, 0)]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+    return path
+
+
+def _request_name():
+    # Dash callbacks are named after their first output id, API calls after the route
+    if request.path.endswith("/_dash-update-component"):
+        output = (request.get_json(silent=True) or {}).get("output", "callback")
+        name = output.strip(".").split(".")[0]
+    else:
+        name = request.endpoint or "api"
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", name)[:60]
+
+
+def _wanted():
+    if not (request.path.endswith("/_dash-update-component") or request.path.startswith("/api/")):
+        return False
+    header = request.headers.get(HEADER)
+    if header and TOKEN and hmac.compare_digest(header.encode(), TOKEN.encode()):
+        return True
+    return SAMPLE_RATE > 0 and random.random() < SAMPLE_RATE
+
+
+# === Flask wiring ===
+def register(server):
+    if SAMPLE_RATE <= 0 and not TOKEN:
+        return
+
+    @server.before_request
+    def _start_profile():
+        if _wanted():
+            g.tco_profile = (Sampler(threading.get_ident()).start(), time.perf_counter())
+
+    def finish():
+        profile = g.pop("tco_profile", None)
+        if profile is None:
+            return None
+        sampler, started = profile
+        stacks = sampler.stop()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        return write_folded(stacks, f"{_request_name()}-{elapsed_ms:.0f}ms") if stacks else None
+
+    @server.after_request
+    def _stop_profile(response):
+        path = finish()
+        if path:
+            response.headers[HEADER] = os.path.basename(path)
+        return response
+
+    # Requests that fail with an exception skip after_request
+    @server.teardown_request
+    def _stop_failed_profile(exc):
+        finish()
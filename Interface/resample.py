@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+
+# === Spectral resampling / alignment ===
+# The deployed model was trained on 1 nm integer wavelengths from 300 to 800.
+# These helpers linearly interpolate any number of spectra onto a target grid
+# in one vectorized pass (np.interp semantics, no per-spectrum Python loop).
+# Used by the training script, the batch CLI and the Interface.
+WAVELENGTH_RANGE = (300.0, 800.0)
+TARGET_GRID = np.arange(300, 801, dtype=np.float64)
+
+
+def clip_grid(grid, lo=WAVELENGTH_RANGE[0], hi=WAVELENGTH_RANGE[1]):
+    grid = np.asarray(grid, dtype=np.float64)
+    return grid[(grid >= lo) & (grid <= hi)]
+
+
+def resample_batch(wavelength, values, grid=TARGET_GRID, fill="nan"):
+    # wavelength: (n,) shared by every spectrum, or (m, n) one row per spectrum
+    # values:     (m, n); rows may be NaN-padded at the end (ragged spectra)
+    # Returns (m, len(grid)). Grid points outside a spectrum's measured range
+    # are NaN (fill="nan") or hold the edge value (fill="edge", like np.interp).
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    wavelength = np.asarray(wavelength, dtype=np.float64)
+    if wavelength.ndim == 1:
+        wavelength = np.broadcast_to(wavelength, values.shape)
+    grid = np.asarray(grid, dtype=np.float64)
+    m, n = values.shape
+    if not m or not n:
+        return np.full((m, len(grid)), np.nan)
+
+    # Padding sorts last and never brackets a grid point
+    valid = np.isfinite(wavelength) & np.isfinite(values)
+    wl = np.where(valid, wavelength, np.inf)
+    order = np.argsort(wl, axis=1, kind="stable")
+    wl = np.take_along_axis(wl, order, axis=1)
+    vals = np.take_along_axis(np.where(valid, values, np.nan), order, axis=1)
+    n_valid = valid.sum(axis=1)
+
+    # Batched searchsorted: shift each row into its own disjoint key range
+    span = np.nanmax(np.where(np.isfinite(wl), np.abs(wl), np.nan)) if valid.any() else 1.0
+    span = max(np.nanmax(np.abs(grid)), span) * 4 + 1
+    offsets = (np.arange(m) * span)[:, None]
+    flat = np.where(np.isfinite(wl), wl, span / 2) + offsets
+    pos = np.searchsorted(flat.ravel(), (grid[None, :] + offsets).ravel()).reshape(m, -1) - np.arange(m)[:, None] * n
+
+    last = np.maximum(n_valid - 1, 0)[:, None]
+    hi = np.clip(pos, 1, np.maximum(last, 1))
+    lo = hi - 1
+    x0 = np.take_along_axis(wl, lo, axis=1)
+    x1 = np.take_along_axis(wl, np.minimum(hi, n - 1), axis=1)
+    y0 = np.take_along_axis(vals, lo, axis=1)
+    y1 = np.take_along_axis(vals, np.minimum(hi, n - 1), axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = np.where(x1 > x0, (grid[None, :] - x0) / (x1 - x0), 0.0)
+    out = y0 + np.clip(t, 0.0, 1.0) * (y1 - y0)
+
+    first_wl = wl[:, :1]
+    last_wl = np.take_along_axis(wl, last, axis=1)
+    below = grid[None, :] < first_wl
+    above = grid[None, :] > last_wl
+    if fill == "edge":
+        out = np.where(below, vals[:, :1], out)
+        out = np.where(above, np.take_along_axis(vals, last, axis=1), out)
+    else:
+        out = np.where(below | above, np.nan, out)
+    out[n_valid == 0] = np.nan
+    return out
+
+
+def spectrum_keys(frame, group=None, spectrum=None):
+    # One integer key per spectrum, in (group, spectrum) order. Without a
+    # `spectrum` id column, a new spectrum starts wherever the wavelength of a
+    # group turns against the current sweep's direction or repeats, so several
+    # sweeps of one material stay separate spectra
+    columns = [c for c in (group, spectrum) if c is not None]
+    if columns:
+        keys = frame.groupby(columns, sort=True, dropna=False).ngroup().to_numpy()
+    else:
+        keys = np.zeros(len(frame), dtype=np.int64)
+    if spectrum is not None or len(frame) < 2:
+        return keys
+
+    order = np.argsort(keys, kind="stable")
+    k = keys[order]
+    step = np.sign(np.nan_to_num(np.diff(pd.to_numeric(frame["Wavelength"], errors="coerce").to_numpy(dtype=np.float64)[order])))
+    same = k[1:] == k[:-1]
+    # Only steps where the sign or the group changes can start a spectrum;
+    # walk those in order (a few per spectrum)
+    candidates = np.flatnonzero(~same | (step == 0) | (step != np.concatenate([step[:1], step[:-1]])))
+    starts = np.zeros(len(k), dtype=bool)
+    starts[0] = True
+    direction = step[0]
+    for j in candidates:
+        if same[j] and step[j] != 0 and step[j] == direction:
+            continue
+        starts[j + 1] = True
+        direction = step[j + 1] if j + 1 < len(step) and same[j + 1] else 0
+    split = np.empty_like(keys)
+    split[order] = np.cumsum(starts) - 1
+    return split
+
+
+def _on_grid(frame, keys, grid):
+    # Every measured wavelength is a grid point, at most once per spectrum
+    wavelength = pd.to_numeric(frame["Wavelength"], errors="coerce").to_numpy(dtype=np.float64)
+    if not np.isin(wavelength, grid).all():
+        return False
+    return not pd.DataFrame({"k": keys, "w": wavelength}).duplicated().any()
+
+
+def resample_frame(frame, columns, group=None, grid=TARGET_GRID, spectrum=None):
+    # Long-format table (one row per point; `group` and/or `spectrum` columns
+    # name the spectra, see spectrum_keys) -> same layout on `grid`, clipped
+    # to the supported range and to each spectrum's measured range
+    grid = clip_grid(grid)
+    labels = [c for c in (group, spectrum) if c is not None]
+    values = [col for col in columns if col != "Wavelength"]
+    if not len(frame):
+        return pd.DataFrame(columns=["Wavelength"] + labels + values)
+    keys = spectrum_keys(frame, group, spectrum)
+
+    # Already on the grid: nothing to interpolate
+    if _on_grid(frame, keys, grid):
+        out = frame.iloc[np.argsort(keys, kind="stable")][["Wavelength"] + labels + values]
+        out = out.astype({col: np.float64 for col in ["Wavelength"] + values})
+        return out.dropna(subset=values).reset_index(drop=True)
+
+    # Scatter rows into NaN-padded (n_spectra, max_points) matrices
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    counts = np.bincount(keys)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    slot = np.arange(len(keys)) - starts[keys]
+    shape = (len(counts), counts.max())
+
+    def padded(col):
+        out = np.full(shape, np.nan)
+        out[keys, slot] = pd.to_numeric(frame[col], errors="coerce").to_numpy(dtype=np.float64)[order]
+        return out
+
+    wavelength = padded("Wavelength")
+    resampled = {col: resample_batch(wavelength, padded(col), grid) for col in values}
+
+    result = {"Wavelength": np.tile(grid, len(counts))}
+    for label in labels:
+        # Each spectrum's label from its first row
+        result[label] = np.repeat(frame[label].to_numpy()[order][starts], len(grid))
+    for col, out in resampled.items():
+        result[col] = out.ravel()
+    out = pd.DataFrame(result)
+    return out.dropna(subset=values).reset_index(drop=True)
@@ -0,0 +1,141 @@
+import os
+import tempfile
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+import inference
+import metrics
+import validation
+from resample import resample_frame
+
+# === Chunked batch scoring ===
+# Files are parsed and scored CHUNK_ROWS rows at a time and appended to the
+# output CSV, so memory stays bounded no matter how large the input is.
+CHUNK_ROWS = 50_000
+RESULTS_DIR = os.environ.get("TCO_RESULTS_DIR", os.path.join(tempfile.gettempdir(), "tco-results"))
+# Request bodies past this size are refused by the upload endpoints (413)
+MAX_UPLOAD_BYTES = int(float(os.environ.get("TCO_MAX_UPLOAD_MB", "512")) * (1 << 20))
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class LimitedStream:
+    # Read-only wrapper that raises UploadTooLarge once more than `limit`
+    # bytes were read (request bodies may arrive chunked, without a length)
+    def __init__(self, stream, limit=MAX_UPLOAD_BYTES):
+        self.stream = stream
+        self.limit = limit
+        self.consumed = 0
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.limit - self.consumed + 1
+        block = self.stream.read(size)
+        self.consumed += len(block)
+        if self.consumed > self.limit:
+            raise UploadTooLarge(f"Upload exceeds {self.limit / (1 << 20):g} MB")
+        return block
+
+
+def score_frame(frame, mode=validation.DEFAULT_MODE):
+    # Adds Predicted + one probability column per class + Validation (per-row
+    # diagnostics); rows with missing, non-numeric or (in "flag" mode)
+    # out-of-range features are left unscored instead of failing the batch
+    lap = metrics.stopwatch("score_frame")
+    X, ok, issues = validation.validate_frame(frame, inference.FEATURES, mode)
+    lap("validation")
+
+    proba = np.full((len(frame), len(inference.classes)), np.nan)
+    if ok.any():
+        proba[ok] = inference.predict_proba(X[ok])
+    lap("inference")
+
+    scored = frame.copy()
+    predicted = np.full(len(frame), "", dtype=object)
+    predicted[ok] = inference.classes[proba[ok].argmax(axis=1)]
+    scored["Predicted"] = predicted
+    for i, cls in enumerate(inference.classes):
+        scored[f"Proba_{cls}"] = proba[:, i]
+    scored["Validation"] = issues
+    lap("response")
+    return scored
+
+
+def resample_spectra(frame, group=None):
+    # Align spectra from any instrument grid onto the 1 nm training grid;
+    # `group` names the column identifying each spectrum (None: one spectrum)
+    missing = [c for c in ("Wavelength", group) if c and c not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    columns = [f for f in inference.FEATURES if f in frame.columns]
+    return resample_frame(frame, columns, group=group or None)
+
+
+def score_csv(source, out_path, chunk_rows=CHUNK_ROWS, progress=None, resample=None, mode=validation.DEFAULT_MODE):
+    # `source` may be a path or any readable stream (e.g. a request body);
+    # `progress(rows, fraction)` gets the share of a file consumed so far.
+    # With `resample` (a group column, or "" for a single spectrum) the file
+    # is read whole and aligned onto the training grid before scoring.
+    # `mode` is the validation policy for out-of-range rows (see validation.py)
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return _score_stream(f, out_path, chunk_rows, progress, os.path.getsize(source), resample, mode)
+    return _score_stream(source, out_path, chunk_rows, progress, None, resample, mode)
+
+
+def _score_stream(stream, out_path, chunk_rows, progress, total, resample=None, mode=validation.DEFAULT_MODE):
+    if resample is None:
+        chunks = pd.read_csv(stream, chunksize=chunk_rows)
+        fraction = lambda rows: min(stream.tell() / total, 1.0) if total else None
+    else:
+        frame = resample_spectra(pd.read_csv(stream), resample)
+        chunks = (frame.iloc[i:i + chunk_rows] for i in range(0, len(frame), chunk_rows))
+        fraction = lambda rows: rows / max(len(frame), 1)
+
+    rows = 0
+    with open(out_path, "w", newline="") as out:
+        for i, chunk in enumerate(chunks):
+            scored = score_frame(chunk, mode)
+            started = time.perf_counter()
+            scored.to_csv(out, header=i == 0, index=False)
+            metrics.observe("score_frame", "serialization", time.perf_counter() - started)
+            rows += len(chunk)
+            if progress:
+                progress(rows, fraction(rows))
+    return rows
+
+
+def spool_upload(stream, block_size=1 << 20):
+    # Copy a request body to disk in fixed-size blocks (bounded memory); a
+    # partial file is removed if reading fails (e.g. UploadTooLarge)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    upload_id = uuid.uuid4().hex
+    path = upload_path(upload_id)
+    try:
+        with open(path, "wb") as f:
+            for block in iter(lambda: stream.read(block_size), b""):
+                f.write(block)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return upload_id
+
+
+def new_result_path():
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    job_id = uuid.uuid4().hex
+    return job_id, result_path(job_id)
+
+
+def upload_path(upload_id):
+    return os.path.join(RESULTS_DIR, f"{upload_id}.upload.csv")
+
+
+def result_path(job_id):
+    return os.path.join(RESULTS_DIR, f"{job_id}.csv")
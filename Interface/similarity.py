@@ -0,0 +1,117 @@
+from functools import lru_cache
+
+import numpy as np
+
+import spectra
+from resample import TARGET_GRID, resample_batch
+
+# === Spectral similarity search ===
+# Reference curves are resampled onto a common wavelength grid and stored as a
+# float32 matrix (one row per spectrum). Queries are answered with a single
+# matrix product against it; for large libraries an optional IVF index
+# (k-means coarse lists, probing the closest few) limits the rows scanned.
+GRID = TARGET_GRID
+
+
+def resample(wavelength, values, grid=GRID):
+    return resample_batch(wavelength, values, grid, fill="edge")[0]
+
+
+class SpectralIndex:
+    def __init__(self, grid=GRID, metric="cosine"):
+        if metric not in ("cosine", "l2"):
+            raise ValueError(f"Unknown metric: {metric}")
+        self.grid = grid
+        self.metric = metric
+        self.labels = []
+        self._rows = []
+        self.matrix = None
+        self.centroids = None
+
+    def add(self, label, wavelength, values):
+        self.labels.append(label)
+        self._rows.append(resample(wavelength, values, self.grid).astype(np.float32))
+        self.matrix = None
+
+    def add_many(self, labels, wavelength, values):
+        # Many spectra at once: (n,) or (m, n) wavelengths, (m, n) NaN-padded values
+        self.labels.extend(labels)
+        self._rows.extend(resample_batch(wavelength, values, self.grid, fill="edge").astype(np.float32))
+        self.matrix = None
+
+    def _prepare(self, M):
+        M = np.asarray(M, dtype=np.float32)
+        if self.metric == "cosine":
+            norms = np.linalg.norm(M, axis=1, keepdims=True)
+            M = M / np.where(norms > 0, norms, 1)
+        return M
+
+    def build(self, approximate=False, n_lists=None, n_iter=10, seed=0):
+        self.matrix = self._prepare(np.vstack(self._rows))
+        self._sq_norms = (self.matrix ** 2).sum(axis=1)
+        self.centroids = None
+        if approximate and len(self.matrix) > 1:
+            self._build_ivf(n_lists or int(np.sqrt(len(self.matrix))), n_iter, seed)
+        return self
+
+    def _build_ivf(self, n_lists, n_iter, seed):
+        # Plain k-means as the coarse quantizer
+        rng = np.random.default_rng(seed)
+        n_lists = min(n_lists, len(self.matrix))
+        centroids = self.matrix[rng.choice(len(self.matrix), n_lists, replace=False)].copy()
+        for _ in range(n_iter):
+            assign = self._distances(self.matrix, centroids).argmin(axis=1)
+            for c in range(n_lists):
+                members = self.matrix[assign == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+        self.centroids = centroids
+        self.assign = self._distances(self.matrix, centroids).argmin(axis=1)
+
+    def _distances(self, Q, M, m_sq=None):
+        dots = Q @ M.T
+        if self.metric == "cosine":
+            return 1.0 - dots
+        if m_sq is None:
+            m_sq = (M ** 2).sum(axis=1)
+        q_sq = (Q ** 2).sum(axis=1, keepdims=True)
+        return np.sqrt(np.maximum(q_sq + m_sq - 2 * dots, 0))
+
+    def search(self, Q, k=5, n_probe=2):
+        # Q: (n_queries, len(grid)) already on the grid -> (indices, distances)
+        if self.matrix is None:
+            self.build()
+        Q = self._prepare(np.atleast_2d(Q))
+        k = min(k, len(self.matrix))
+
+        if self.centroids is None:
+            D = self._distances(Q, self.matrix, self._sq_norms)
+            idx = np.argpartition(D, k - 1, axis=1)[:, :k]
+            part = np.take_along_axis(D, idx, axis=1)
+            order = np.argsort(part, axis=1)
+            return np.take_along_axis(idx, order, axis=1), np.take_along_axis(part, order, axis=1)
+
+        # Approximate: exact distances only inside the n_probe closest lists
+        probes = np.argsort(self._distances(Q, self.centroids), axis=1)[:, :n_probe]
+        all_idx, all_dist = [], []
+        for q, lists in zip(Q, probes):
+            cand = np.flatnonzero(np.isin(self.assign, lists))
+            d = self._distances(q[None, :], self.matrix[cand], self._sq_norms[cand])[0]
+            top = np.argsort(d)[:k]
+            all_idx.append(np.pad(cand[top], (0, k - len(top)), constant_values=-1))
+            all_dist.append(np.pad(d[top], (0, k - len(top)), constant_values=np.inf))
+        return np.array(all_idx), np.array(all_dist)
+
+    def query(self, wavelength, values, k=5):
+        idx, dist = self.search(resample(wavelength, values, self.grid)[None, :], k)
+        return [(self.labels[i], float(d)) for i, d in zip(idx[0], dist[0]) if i >= 0]
+
+
+@lru_cache(maxsize=4)
+def reference_index(column="Transmission", metric="cosine"):
+    # One reference curve per material block of TCO.csv
+    index = SpectralIndex(metric=metric)
+    for material in spectra.materials():
+        curve = spectra.curve(material)
+        index.add(material, curve["Wavelength"], curve[column])
+    return index.build()
@@ -0,0 +1,64 @@
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from downsample import downsample_indices
+
+# === Shared spectral data store ===
+# The dataset is read once per worker and kept as per-material NumPy arrays
+# sorted by wavelength, so pages slice windows instead of filtering DataFrames.
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "TCO.csv")
+PROPERTIES = ["AbsorptionRate", "Transmission", "OpticalDensity"]
+
+df = pd.read_csv(DATA_FILE)
+
+_curves = {}
+for _material, _block in df.groupby("Material", sort=False):
+    _block = _block.sort_values("Wavelength")
+    _curves[_material] = {
+        col: _block[col].to_numpy(dtype=np.float64)
+        for col in ["Wavelength", *PROPERTIES]
+    }
+
+
+def materials():
+    return list(_curves)
+
+
+def curve(material):
+    return _curves[material]
+
+
+def window_slice(material, lo, hi):
+    wavelength = _curves[material]["Wavelength"]
+    start = np.searchsorted(wavelength, lo, side="left")
+    stop = np.searchsorted(wavelength, hi, side="right")
+    return slice(start, stop)
+
+
+def window_points(material, column, lo, hi, max_points):
+    # Downsampled (indices, x, y) for one material/property inside [lo, hi]
+    data = _curves[material]
+    window = window_slice(material, lo, hi)
+    x = data["Wavelength"][window]
+    y = data[column][window]
+    keep = downsample_indices(x, y, max_points)
+    return keep + window.start, x[keep], y[keep]
+
+
+@lru_cache(maxsize=None)
+def summary_stats(material):
+    # Per-property min/mean/max plus the peak-transmission wavelength
+    data = _curves[material]
+    stats = {
+        prop: {
+            "min": float(data[prop].min()),
+            "mean": float(data[prop].mean()),
+            "max": float(data[prop].max()),
+        }
+        for prop in PROPERTIES
+    }
+    stats["PeakWavelength"] = float(data["Wavelength"][np.argmax(data["Transmission"])])
+    return stats
@@ -0,0 +1,154 @@
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import scoring
+import validation
+
+# === tco-predict: headless batch scoring ===
+# Scores any number of CSV/Parquet files with the deployed pipeline and writes
+# `<name>.pred.<ext>` next to each input (original columns + Predicted +
+# Proba_<class>). Large files are split into chunks that are scored across a
+# process pool; the model is loaded once in the parent and shared read-only
+# with forked workers.
+#
+#   python tco_predict.py lab/*.csv --workers 8
+#   python tco_predict.py run42.parquet --chunk-rows 200000
+#   python tco_predict.py instrument_b.csv --resample SampleID
+
+
+def _init_worker():
+    # One model thread per process: the pool provides the parallelism
+    import inference
+    final = inference.pipeline[-1] if hasattr(inference.pipeline, "steps") else None   # compacted models have no steps
+    for estimator in getattr(final, "estimators_", []):
+        if hasattr(estimator, "set_params") and "n_jobs" in estimator.get_params():
+            estimator.set_params(n_jobs=1)
+
+
+def _score_chunk(frame, mode):
+    return scoring.score_frame(frame, mode)
+
+
+def iter_chunks(path, chunk_rows):
+    if path.lower().endswith((".parquet", ".pq")):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet input needs pyarrow: pip install pyarrow")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+
+
+def iter_resampled(path, chunk_rows, group):
+    # Alignment needs each spectrum whole, so the file is read in one go
+    frame = scoring.resample_spectra(pd.concat(iter_chunks(path, chunk_rows), ignore_index=True), group)
+    for start in range(0, len(frame), chunk_rows):
+        yield frame.iloc[start:start + chunk_rows]
+
+
+def output_path(path, suffix):
+    stem, ext = os.path.splitext(path)
+    return f"{stem}{suffix}{ext}"
+
+
+class _Writer:
+    # Appends scored chunks to CSV, or to a Parquet file via pyarrow
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.lower().endswith((".parquet", ".pq"))
+        self.handle = None
+
+    def write(self, frame):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self.handle is None:
+                self.handle = pq.ParquetWriter(self.path, table.schema)
+            self.handle.write_table(table)
+        else:
+            first = self.handle is None
+            if first:
+                self.handle = open(self.path, "w", newline="")
+            frame.to_csv(self.handle, header=first, index=False)
+
+    def close(self):
+        if self.handle is not None:
+            self.handle.close()
+
+
+def score_file(path, pool, chunk_rows, suffix, max_pending, resample=None, mode=validation.DEFAULT_MODE):
+    out_path = output_path(path, suffix)
+    chunks = iter_chunks(path, chunk_rows) if resample is None else iter_resampled(path, chunk_rows, resample)
+    writer = _Writer(out_path)
+    rows = flagged = 0
+    pending = []
+
+    def write(scored):
+        nonlocal rows, flagged
+        writer.write(scored)
+        rows += len(scored)
+        flagged += int((scored["Validation"] != "").sum())
+
+    try:
+        # Keep at most `max_pending` chunks in flight so memory stays bounded;
+        # results are written in input order
+        for chunk in chunks:
+            pending.append(pool.submit(_score_chunk, chunk, mode))
+            if len(pending) >= max_pending:
+                write(pending.pop(0).result())
+        for future in pending:
+            write(future.result())
+    finally:
+        writer.close()
+    return out_path, rows, flagged
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="tco-predict", description="Score TCO spectra files with the deployed model.")
+    parser.add_argument("files", nargs="+", help="CSV or Parquet files with Wavelength, AbsorptionRate, Transmission, OpticalDensity")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="scoring processes (default: all cores)")
+    parser.add_argument("--chunk-rows", type=int, default=scoring.CHUNK_ROWS, help="rows per chunk (default: %(default)s)")
+    parser.add_argument("--suffix", default=".pred", help="inserted before the output extension (default: %(default)s)")
+    parser.add_argument("--resample", nargs="?", const="", default=None, metavar="GROUP",
+                        help="align spectra onto the 1 nm 300-800 nm training grid first; GROUP names the column "
+                             "identifying each spectrum (omit if the file is one spectrum). Loads each file whole")
+    parser.add_argument("--on-invalid", choices=validation.MODES, default=validation.DEFAULT_MODE,
+                        help="out-of-range rows: leave unscored (flag) or clip to the valid range (clamp); "
+                             "either way the Validation column says why (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    # Load the model before the pool forks so workers share it
+    import inference
+    print(f"Model {inference.MODEL_VERSION} loaded; classes: {', '.join(inference.classes)}")
+
+    methods = mp.get_all_start_methods()
+    context = mp.get_context("fork" if "fork" in methods else "spawn")
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=context, initializer=_init_worker) as pool:
+        for path in args.files:
+            started = time.perf_counter()
+            try:
+                out_path, rows, flagged = score_file(path, pool, args.chunk_rows, args.suffix, 2 * args.workers, args.resample, args.on_invalid)
+            except Exception as e:
+                failed += 1
+                print(f"❌ {path}: {e}", file=sys.stderr)
+                continue
+            elapsed = time.perf_counter() - started
+            print(f"✅ {path}: {rows} rows in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s) -> {out_path}")
+            if flagged:
+                print(f"   ⚠️ {flagged} rows failed validation ({args.on_invalid}); see the Validation column")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
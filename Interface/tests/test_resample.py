@@ -0,0 +1,53 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from resample import TARGET_GRID, resample_frame, spectrum_keys
+
+COLUMNS = ["Wavelength", "Transmission"]
+
+
+def sweep(material, wavelength, offset=0.0):
+    wavelength = np.asarray(wavelength, dtype=np.float64)
+    return pd.DataFrame({"Material": material, "Wavelength": wavelength, "Transmission": wavelength / 1000 + offset})
+
+
+def test_on_grid_passthrough():
+    frame = pd.concat([sweep("AZO", TARGET_GRID), sweep("ITO", TARGET_GRID[::-1])])
+    out = resample_frame(frame, COLUMNS, group="Material")
+    assert len(out) == 2 * len(TARGET_GRID)
+    assert out["Material"].tolist() == ["AZO"] * 501 + ["ITO"] * 501
+
+
+def test_material_with_several_spectra_keeps_each():
+    # Two off-grid sweeps of AZO (the second one descending) and one of ITO
+    half = TARGET_GRID[:-1] + 0.5
+    frame = pd.concat([sweep("AZO", half), sweep("ITO", half), sweep("AZO", half[::-1], offset=1.0)])
+    out = resample_frame(frame, COLUMNS, group="Material")
+    assert out["Material"].value_counts().to_dict() == {"AZO": 998, "ITO": 499}
+    azo = out[out["Material"] == "AZO"]["Transmission"].to_numpy()
+    np.testing.assert_allclose(azo[:499], TARGET_GRID[1:-1] / 1000)
+    np.testing.assert_allclose(azo[499:], TARGET_GRID[1:-1] / 1000 + 1.0)
+
+
+def test_spectrum_column():
+    half = TARGET_GRID[:-1] + 0.5
+    frame = pd.concat([sweep("AZO", half).assign(Run=1), sweep("AZO", half).assign(Run=2)])
+    assert len(np.unique(spectrum_keys(frame, "Material", "Run"))) == 2
+    out = resample_frame(frame, COLUMNS, group="Material", spectrum="Run")
+    assert out.groupby("Run").size().to_dict() == {1: 499, 2: 499}
+
+
+def test_repeated_on_grid_sweeps_split():
+    frame = pd.concat([sweep("AZO", TARGET_GRID), sweep("AZO", TARGET_GRID)])
+    assert len(np.unique(spectrum_keys(frame, "Material"))) == 2
+    assert len(resample_frame(frame, COLUMNS, group="Material")) == 2 * len(TARGET_GRID)
+
+
+def test_empty_frame():
+    out = resample_frame(sweep("AZO", []), COLUMNS, group="Material")
+    assert out.empty
+    assert list(out.columns) == ["Wavelength", "Material", "Transmission"]
@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# === Input validation ===
+# Physical ranges of the model inputs. This schema is the single source for the
+# Classify page clamps, the batch endpoint, the CLI and the watch folder; whole
+# arrays are checked with NumPy masks in one pass, never row by row.
+SCHEMA = {
+    "Wavelength": (300.0, 800.0),
+    "AbsorptionRate": (0.0, 1.0),
+    "Transmission": (0.0, 100.0),
+    "OpticalDensity": (0.0, 100000.0),
+}
+
+# "flag": out-of-range rows are reported and left unscored
+# "clamp": out-of-range values are clipped to the schema bounds and scored
+MODES = ("flag", "clamp")
+DEFAULT_MODE = os.environ.get("TCO_VALIDATION", "flag")
+
+
+def validate(X, columns=None, mode=DEFAULT_MODE):
+    # X: (n, len(columns)) values in schema column order (default: all of it).
+    # Returns (X, ok, issues): X (clipped in "clamp" mode), a mask of rows that
+    # may be scored and one diagnostic string per row ("" when clean)
+    if mode not in MODES:
+        raise ValueError(f"Unknown validation mode: {mode} (expected {' or '.join(MODES)})")
+    columns = list(SCHEMA) if columns is None else list(columns)
+    X = np.array(X, dtype=np.float64).reshape(-1, len(columns))
+    lo = np.array([SCHEMA[c][0] for c in columns])
+    hi = np.array([SCHEMA[c][1] for c in columns])
+
+    finite = np.isfinite(X)
+    below = X < lo
+    above = X > hi
+    out_of_range = below | above
+    ok = finite.all(axis=1)
+    if mode == "clamp":
+        X = np.clip(X, lo, hi)
+    else:
+        ok &= ~out_of_range.any(axis=1)
+
+    # Diagnostics are only assembled for the affected rows
+    issues = np.full(len(X), "", dtype=object)
+    suffix = " (clamped)" if mode == "clamp" else ""
+    for j, col in enumerate(columns):
+        for mask, tag in (
+            (~finite[:, j], f"{col} missing"),
+            (below[:, j], f"{col}<{lo[j]:g}{suffix}"),
+            (above[:, j], f"{col}>{hi[j]:g}{suffix}"),
+        ):
+            if mask.any():
+                issues[mask] += "; " + tag
+    flagged = issues != ""
+    issues[flagged] = pd.Series(issues[flagged], dtype=object).str[2:].to_numpy()
+    return X, ok, issues
+
+
+def validate_frame(frame, columns=None, mode=DEFAULT_MODE):
+    # Same as validate() for a table; non-numeric cells count as missing
+    columns = list(SCHEMA) if columns is None else list(columns)
+    missing = [c for c in columns if c not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    X = frame[columns].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    return validate(X, columns, mode)
+
+
+def clientside_clamp(column):
+    # Browser-side clamp for one Classify page input, generated from SCHEMA.
+    # Returns [raw value, clamped value] like the original inline callbacks.
+    lo, hi = SCHEMA[column]
+    return f"""
+        function(val){{
+            if (val === null || val === undefined || val === '') {{
+                return [null, val];
+            }}
+            var num = Number(val);
+            if (isNaN(num)) {{
+                return [val, val];
+            }}
+            return [num, Math.min(Math.max(num, {lo:g}), {hi:g})];
+        }}
+        """
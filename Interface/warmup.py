@@ -0,0 +1,67 @@
+import logging
+import os
+import sys
+import threading
+import time
+
+import inference
+import metrics
+import spectra
+from figures import DEFAULT_RANGE
+
+log = logging.getLogger(__name__)
+
+# === Startup warm-up ===
+# The default views on /visualize and /visualize-zh are few and predictable, so
+# their statistics, overlay predictions and figure-cache entries are built before the first request.
+#   TCO_WARMUP=thread  build in a background thread at worker boot
+#   TCO_WARMUP=sync    build before the app starts serving
+#   TCO_WARMUP=off     skip (caches fill lazily)
+# The default is sync under `gunicorn --preload` (the app is imported in the
+# master: a sync warm-up runs once and every forked worker inherits the warm
+# caches, whereas a master thread's work may not be) and thread otherwise.
+
+
+def warm_up():
+    # Not counted in the latency metrics: these are cold-cache timings
+    with metrics.paused():
+        _warm_up()
+
+
+def _warm_up():
+    from pages import visualize, visualize_zh
+
+    started = time.perf_counter()
+    materials = spectra.materials()
+    for material in materials:
+        spectra.summary_stats(material)
+        inference.material_predictions(material)
+
+    # Run the real callbacks so every cache layer they touch is populated
+    for page in (visualize, visualize_zh):
+        for material in materials:
+            page.update_graph(None, material, list(DEFAULT_RANGE), None)
+        page.compare_materials(None, materials, ["Transmission"], list(DEFAULT_RANGE))
+
+    log.info("Warm-up finished in %.2fs", time.perf_counter() - started)
+
+
+def _preloading():
+    # gunicorn --preload / preload_app = True, seen from the importing master
+    if "gunicorn" not in sys.modules:
+        return False
+    args = sys.argv[1:] + os.environ.get("GUNICORN_CMD_ARGS", "").split()
+    return "--preload" in args or bool(getattr(sys.modules.get("__config__"), "preload_app", False))
+
+
+def start():
+    mode = os.environ.get("TCO_WARMUP", "sync" if _preloading() else "thread").lower()
+    if mode in ("0", "off", "false", "no"):
+        return None
+    if mode == "sync":
+        warm_up()
+        return None
+
+    thread = threading.Thread(target=warm_up, name="tco-warmup", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,227 @@
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import signal
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+
+import inference
+import scoring
+
+# === Watch-folder scoring daemon ===
+# Polls a directory for new or changed measurement files and scores them with
+# the shared inference engine (scoring.score_frame). Content hashes of every
+# processed file are recorded in a state file, so restarts and renamed copies
+# never rescore old data. The state also caches each file's digest by (path,
+# size, mtime_ns), so only new or modified files are read and hashed on a
+# poll. Small files are concatenated and scored together in one model call;
+# large files are scored in chunks.
+#
+#   python watch_folder.py /mnt/instruments/exports --output-dir /mnt/scored
+STATE_FILE = ".tco_processed.json"
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class WatchFolder:
+    def __init__(self, watch_dir, output_dir, pattern="*.csv", batch_rows=100_000, small_file_bytes=20 << 20):
+        self.watch_dir = watch_dir
+        self.output_dir = output_dir
+        self.pattern = pattern
+        self.batch_rows = batch_rows
+        self.small_file_bytes = small_file_bytes
+        self.state_path = os.path.join(output_dir, STATE_FILE)
+        self.processed, self.hashes = self._load_state()
+        self._last_seen = {}  # path -> (size, mtime_ns) from the previous poll
+
+    def _load_state(self):
+        # -> ({digest: record}, {path: [size, mtime_ns, digest]}); older state
+        # files are the bare {digest: record} mapping
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                state = json.load(f)
+            if "processed" in state:
+                return state["processed"], state.get("hashes", {})
+            return state, {}
+        return {}, {}
+
+    def _save_state(self):
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"processed": self.processed, "hashes": self.hashes}, f, indent=1)
+        os.replace(tmp, self.state_path)
+
+    def _stable_files(self):
+        # A file is ready once its size and mtime are unchanged between two
+        # polls, i.e. the instrument has finished writing it
+        ready = []
+        seen = {}
+        for entry in os.scandir(self.watch_dir):
+            if not entry.is_file() or not fnmatch.fnmatch(entry.name, self.pattern):
+                continue
+            stat = entry.stat()
+            seen[entry.path] = (stat.st_size, stat.st_mtime_ns)
+            if self._last_seen.get(entry.path) == seen[entry.path]:
+                ready.append(entry.path)
+        self._last_seen = seen
+        return sorted(ready)
+
+    def _digest(self, path):
+        # Cached while the file's size and mtime are unchanged
+        size, mtime_ns = self._last_seen[path]
+        cached = self.hashes.get(path)
+        if cached is not None and cached[:2] == [size, mtime_ns]:
+            return cached[2]
+        digest = file_hash(path)
+        self.hashes[path] = [size, mtime_ns, digest]
+        return digest
+
+    def _output_path(self, path):
+        stem, ext = os.path.splitext(os.path.basename(path))
+        return os.path.join(self.output_dir, f"{stem}.pred{ext}")
+
+    def _mark(self, digest, path, rows, error=None):
+        # Failed files are recorded too, so they are only retried once changed
+        self.processed[digest] = {
+            "file": os.path.basename(path),
+            "rows": rows,
+            "scored_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        if error:
+            self.processed[digest]["error"] = error
+            print(f"❌ {path}: {error}", file=sys.stderr)
+
+    def poll(self):
+        todo = []
+        queued = set()
+        hashed = dict(self.hashes)
+        for path in self._stable_files():
+            digest = self._digest(path)
+            if digest not in self.processed and digest not in queued:
+                todo.append((path, digest))
+                queued.add(digest)
+        # Forget files that left the folder
+        self.hashes = {p: h for p, h in self.hashes.items() if p in self._last_seen}
+        if not todo:
+            if self.hashes != hashed:
+                self._save_state()
+            return 0
+
+        small = [(p, d) for p, d in todo if os.path.getsize(p) <= self.small_file_bytes]
+        large = [(p, d) for p, d in todo if os.path.getsize(p) > self.small_file_bytes]
+
+        for path, digest in large:
+            try:
+                rows = scoring.score_csv(path, self._output_path(path))
+            except Exception as e:
+                self._mark(digest, path, 0, str(e))
+                continue
+            self._mark(digest, path, rows)
+            print(f"✅ {path}: {rows} rows")
+
+        # Small files: group up to batch_rows rows per model call
+        batch = []
+        batch_rows = 0
+        for path, digest in small:
+            try:
+                frame = pd.read_csv(path)
+                missing = [f for f in inference.FEATURES if f not in frame.columns]
+                if missing:
+                    raise ValueError(f"Missing columns: {', '.join(missing)}")
+            except Exception as e:
+                self._mark(digest, path, 0, str(e))
+                continue
+            batch.append((path, digest, frame))
+            batch_rows += len(frame)
+            if batch_rows >= self.batch_rows:
+                self._score_batch_or_mark(batch)
+                batch, batch_rows = [], 0
+        if batch:
+            self._score_batch_or_mark(batch)
+
+        self._save_state()
+        return len(todo)
+
+    def _score_batch_or_mark(self, batch):
+        # A failed batch marks its unwritten files as failed, like a failed
+        # large file, instead of stopping the daemon
+        try:
+            self._score_batch(batch)
+        except Exception as e:
+            for path, digest, frame in batch:
+                if digest not in self.processed:
+                    self._mark(digest, path, 0, f"batch scoring failed: {e}")
+
+    def _score_batch(self, batch):
+        combined = pd.concat([frame for _, _, frame in batch], ignore_index=True)
+        scored = scoring.score_frame(combined)
+        added = [c for c in scored.columns if c not in combined.columns]
+
+        start = 0
+        for path, digest, frame in batch:
+            # Each output keeps only its own input columns plus the scores
+            part = scored.iloc[start:start + len(frame)][list(frame.columns) + added]
+            start += len(frame)
+            part.to_csv(self._output_path(path), index=False)
+            self._mark(digest, path, len(frame))
+            print(f"✅ {path}: {len(frame)} rows")
+        if len(batch) > 1:
+            print(f"   ({len(batch)} files, {len(combined)} rows in one model call)")
+
+    def run(self, interval):
+        running = True
+
+        def stop(signum, frame):
+            nonlocal running
+            running = False
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+        print(f"Watching {self.watch_dir} every {interval}s -> {self.output_dir}")
+        while running:
+            try:
+                self.poll()
+            except Exception as e:
+                # e.g. the state file could not be written; retried next poll
+                print(f"❌ Poll failed: {e}", file=sys.stderr)
+            time.sleep(interval)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score new measurement files dropped into a directory.")
+    parser.add_argument("watch_dir")
+    parser.add_argument("--output-dir", help="where results and the state file go (default: <watch_dir>/scored)")
+    parser.add_argument("--pattern", default="*.csv", help="file name pattern (default: %(default)s)")
+    parser.add_argument("--interval", type=float, default=5.0, help="poll interval in seconds (default: %(default)s)")
+    parser.add_argument("--batch-rows", type=int, default=100_000, help="max rows per combined model call (default: %(default)s)")
+    parser.add_argument("--small-file-mb", type=float, default=20, help="files up to this size are batched together (default: %(default)s)")
+    parser.add_argument("--once", action="store_true", help="process what is there and exit")
+    args = parser.parse_args(argv)
+
+    output_dir = args.output_dir or os.path.join(args.watch_dir, "scored")
+    os.makedirs(output_dir, exist_ok=True)
+    watcher = WatchFolder(args.watch_dir, output_dir, args.pattern, args.batch_rows, int(args.small_file_mb * (1 << 20)))
+
+    if args.once:
+        # Two polls so files pass the "unchanged since last poll" check
+        watcher._stable_files()
+        watcher.poll()
+        return 0
+
+    watcher.run(args.interval)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,7 @@ import numpy as np
 import pandas as pd
 import seaborn as sns
 import joblib
-from sklearn.model_selection import train_test_split, learning_curve
+from sklearn.model_selection import learning_curve
 from sklearn.metrics import (
     accuracy_score,
     classification_report,
@@ -11,59 +11,34 @@ from sklearn.metrics import (
     ConfusionMatrixDisplay
 )
 from sklearn.metrics import roc_curve, auc
-from sklearn.preprocessing import LabelBinarizer, LabelEncoder, StandardScaler
-from sklearn.pipeline import make_pipeline
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.neural_network import MLPClassifier
-from xgboost import XGBClassifier
-from sklearn.svm import SVC
-from sklearn.neighbors import KNeighborsClassifier
-from sklearn.multiclass import OneVsRestClassifier
-from imblearn.over_sampling import SMOTE
-
-# Load dataset
-df = pd.read_csv("TCO.csv")
-
-# === Keep only 4 raw features ===
-X = df[[
-    "Wavelength",
-    "AbsorptionRate",
-    "Transmission",
-    "OpticalDensity"
-]]
-y = df["Material"]
-
-# Encode class labels
-le = LabelEncoder()
-y_encoded = le.fit_transform(y)
-class_names = le.classes_
+from sklearn.preprocessing import LabelBinarizer
+
+from tco_models import FEATURE_COLUMNS, load_dataset, make_models, split_dataset
+import portable   # Interface/portable.py (tco_models puts Interface/ on the path)
+from incremental import HOLDOUT_FILE, PORTABLE_DIR
+from selection import (
+    ENSEMBLE_DIR, MANIFEST_FILE, artifact_name, profile_model, profile_table, save_ensemble, select_model, write_manifest
+)
 
-# Train-test split
-X_train, X_test, y_train, y_test = train_test_split(X, y_encoded, test_size=0.2, random_state=42)
+# Load dataset, aligned onto the 1 nm 300-800 nm grid (see tco_models.py)
+df = load_dataset("TCO.csv")
+print(f"Resampled dataset: {len(df)} rows, {df['Material'].nunique()} materials")
 
-# Apply SMOTE on training data only
-sm = SMOTE(random_state=42)
-X_train, y_train = sm.fit_resample(X_train, y_train)
+# === Keep only 4 raw features; encode labels; split; SMOTE on training data only ===
+le, X, y_encoded, X_train, X_test, y_train, y_test = split_dataset(df)
+class_names = le.classes_
 
 # Binarize for ROC (optional)
 lb = LabelBinarizer()
 y_test_bin = lb.fit_transform(y_test)
 
 # Define models
-models = {
-    "SVC": make_pipeline(StandardScaler(), OneVsRestClassifier(SVC(probability=True, C=10, kernel='rbf'))),
-    "KNN": make_pipeline(StandardScaler(), OneVsRestClassifier(KNeighborsClassifier(n_neighbors=3))),
-    "Decision Tree": OneVsRestClassifier(DecisionTreeClassifier()),
-    "Random Forest": OneVsRestClassifier(RandomForestClassifier(n_estimators=200)),
-    "XGBoost": make_pipeline(StandardScaler(), OneVsRestClassifier(XGBClassifier(
-        eval_metric='mlogloss', learning_rate=0.1, n_estimators=200, max_depth=10))),
-    "MLP": make_pipeline(StandardScaler(), OneVsRestClassifier(MLPClassifier(max_iter=500)))
-}
+models = make_models()
 
 # Evaluation and storage
 accuracy_results = []
 conf_matrices = {}
+fitted = {}   # fitted once here, reused by the ROC curves and the selection
 
 print("=== Model Evaluation ===")
 for name, model in models.items():
@@ -75,6 +50,7 @@ for name, model in models.items():
         print(classification_report(y_test, y_pred, target_names=class_names))
         accuracy_results.append((name, acc))
         conf_matrices[name] = confusion_matrix(y_test, y_pred)
+        fitted[name] = model
     except Exception as e:
         print(f"{name} failed: {e}")
         accuracy_results.append((name, 0.0))
@@ -117,9 +93,8 @@ plt.show()
 # === ROC Curves ===
 plt.figure(figsize=(14, 10))
 
-for name, model in models.items():
+for name, model in fitted.items():
     try:
-        model.fit(X_train, y_train)
         if hasattr(model, "predict_proba"):
             y_score = model.predict_proba(X_test)
         else:
@@ -174,18 +149,62 @@ for idx, (name, model) in enumerate(models.items()):
 plt.tight_layout()
 plt.show()
 
-# === Save Trained XGBoost Pipeline ===
-xgb_pipeline = models["XGBoost"]
-xgb_pipeline.fit(X_train, y_train)
+# === Latency-aware model selection ===
+# Ship the fastest model within ACCURACY_TOLERANCE of the best accuracy that
+# fits the serving budgets (e.g. trade 0.1% accuracy for 10x faster serving)
+ACCURACY_TOLERANCE = 0.001
+LATENCY_BUDGET_MS = 50.0     # single-row predict_proba
+SIZE_BUDGET_MB = 50.0        # pickled pipeline
 
-joblib.dump(xgb_pipeline, "xgb_pipeline_model.pkl")
+profiles = {}
+for name, model in fitted.items():
+    try:
+        profiles[name] = profile_model(model, X_test, y_test)
+    except Exception as e:
+        print(f"Skipping {name} in selection: {e}")
+
+print("\n=== Candidate Profiles ===")
+print(profile_table(profiles).round(4).to_string())
+
+selected, reason = select_model(profiles, ACCURACY_TOLERANCE, LATENCY_BUDGET_MS, SIZE_BUDGET_MB)
+print(f"\nSelected model: {selected} ({reason})")
+
+# === Save the selected pipeline + manifest ===
+model_file = artifact_name(selected)
+final_pipeline = fitted[selected]
+joblib.dump(final_pipeline, model_file)
 joblib.dump(le, "label_encoder.pkl")
-print("✅ XGBoost model pipeline saved as 'xgb_pipeline_model.pkl'")
+# Held-out split, kept for validating incremental updates (incremental.py)
+X_test.assign(Material=le.inverse_transform(y_test)).to_csv(HOLDOUT_FILE, index=False)
+
+# XGBoost pipelines are also exported as portable boosters + JSON (no sklearn
+# unpickling at serving time) and served from there
+try:
+    portable.export(final_pipeline, le.classes_, PORTABLE_DIR, FEATURE_COLUMNS)
+    served_file = PORTABLE_DIR
+except ValueError:
+    served_file = model_file
+
+write_manifest(
+    MANIFEST_FILE, selected, reason,
+    {"accuracy_tolerance": ACCURACY_TOLERANCE, "latency_budget_ms": LATENCY_BUDGET_MS, "size_budget_mb": SIZE_BUDGET_MB},
+    profiles, served_file, "label_encoder.pkl",
+)
+print(f"✅ {selected} pipeline saved as '{model_file}'")
 print("✅ Label encoder saved as 'label_encoder.pkl'")
+print(f"✅ Held-out set saved as '{HOLDOUT_FILE}' (used by incremental.py)")
+if served_file == PORTABLE_DIR:
+    print(f"✅ Portable export written to '{PORTABLE_DIR}/' (served instead of the .pkl)")
+print(f"✅ Selection written to '{MANIFEST_FILE}' (copy it to Interface/ with the artifacts it names, "
+      "then rerun Interface/decision_surface.py)")
+
+# === Save every fitted pipeline for the Interface's ensemble mode ===
+members = save_ensemble(fitted, profiles)
+print(f"✅ {len(members)} pipelines saved to '{ENSEMBLE_DIR}/' (copy the folder to Interface/ for ensemble mode)")
 
 # --- Test one prediction before finishing ---
 sample = X_test.iloc[[0]]
-pred_index = xgb_pipeline.predict(sample)[0]
+pred_index = final_pipeline.predict(sample)[0]
 pred_label = le.inverse_transform([pred_index])[0]
 
 print("Raw prediction index:", pred_index)
@@ -212,7 +231,7 @@ try:
         "OpticalDensity"
     ])
 
-    pred_index = xgb_pipeline.predict(input_df)[0]
+    pred_index = final_pipeline.predict(input_df)[0]
     pred_label = le.inverse_transform([pred_index])[0]
     print(f"✅ Predicted Material: {pred_label}")
 
@@ -0,0 +1,124 @@
+import argparse
+import itertools
+import json
+import os
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from tco_models import load_dataset, split_dataset
+from selection import MANIFEST_FILE, profile_model
+import compact   # Interface/compact.py (tco_models puts Interface/ on the path)
+
+# === Post-training compaction of the XGBoost pipeline ===
+# Builds compact variants of the trained pipeline over a grid of tree-drop
+# tolerances, depth caps and threshold/leaf precisions, profiles each one like
+# the model selection does (held-out accuracy, single-row and batch latency,
+# artifact size, load time) and writes the trade-off report. The smallest
+# variant within --accuracy-tolerance of the original is saved as a .npz the
+# Interface loads with NumPy only; --deploy points the manifest at it.
+#
+#   python compaction.py
+#   python compaction.py --tolerances 0 0.02 --depths none 9 --precisions float32/float16 --deploy
+COMPACT_FILE = "xgb_compact_model" + compact.SUFFIX
+REPORT_FILE = "compaction_report.json"
+
+
+def _depth(value):
+    return None if value.lower() == "none" else int(value)
+
+
+def _precision(value):
+    threshold, leaf = value.split("/")
+    if threshold not in compact.DTYPES or leaf not in compact.DTYPES:
+        raise argparse.ArgumentTypeError(f"expected <threshold>/<leaf> from {compact.DTYPES}, got {value}")
+    return threshold, leaf
+
+
+def compact_variants(pipeline, X_reference, tolerances, depths, precisions):
+    for tolerance, max_depth, (threshold_dtype, leaf_dtype) in itertools.product(tolerances, depths, precisions):
+        params = {"tolerance": tolerance, "max_depth": max_depth, "threshold_dtype": threshold_dtype, "leaf_dtype": leaf_dtype}
+        yield params, compact.compact_pipeline(pipeline, X_reference, tolerance, max_depth, threshold_dtype, leaf_dtype)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compact the trained XGBoost pipeline and report the trade-offs.")
+    parser.add_argument("--model", default="xgb_pipeline_model.pkl", help="trained pipeline (default: %(default)s)")
+    parser.add_argument("--data", default="TCO.csv", help="training data, for the held-out split (default: %(default)s)")
+    parser.add_argument("--tolerances", type=float, nargs="+", default=[0.0, 0.01, 0.05],
+                        help="drop trees whose mean |output| is below this (default: %(default)s)")
+    parser.add_argument("--depths", type=_depth, nargs="+", default=[None, 8], help="depth caps, 'none' for uncapped")
+    parser.add_argument("--precisions", type=_precision, nargs="+",
+                        default=[("float32", "float32"), ("float32", "float16"), ("float16", "float16")],
+                        help="<threshold>/<leaf> dtypes (default: float32/float32 float32/float16 float16/float16)")
+    parser.add_argument("--accuracy-tolerance", type=float, default=0.001,
+                        help="max held-out accuracy loss for the saved variant (default: %(default)s)")
+    parser.add_argument("--output", default=COMPACT_FILE, help="compact artifact (default: %(default)s)")
+    parser.add_argument("--report", default=REPORT_FILE, help="trade-off report (default: %(default)s)")
+    parser.add_argument("--deploy", action="store_true", help=f"point {MANIFEST_FILE}'s model_file at the compact artifact")
+    args = parser.parse_args(argv)
+
+    pipeline = joblib.load(args.model)
+    if not all(hasattr(e, "get_booster") for e in getattr(pipeline.steps[-1][1], "estimators_", [None])):
+        print(f"❌ {args.model} is not a one-vs-rest XGBoost pipeline; nothing to compact")
+        return 1
+
+    # Same held-out split as TCO.py; tree contributions are measured on the
+    # training part only
+    _, _, _, X_train, X_test, _, y_test = split_dataset(load_dataset(args.data), oversample=False)
+    reference = pipeline.predict_proba(X_test)
+
+    rows = {"original": dict(profile_model(pipeline, X_test, y_test), trees=sum(
+        e.get_booster().num_boosted_rounds() for e in pipeline.steps[-1][1].estimators_), agreement=1.0, max_proba_diff=0.0)}
+    variants = {}
+    for params, model in compact_variants(pipeline, X_train, args.tolerances, args.depths, args.precisions):
+        name = "tol={tolerance:g} depth={max_depth} {threshold_dtype}/{leaf_dtype}".format(**params)
+        proba = model.predict_proba(X_test)
+        rows[name] = dict(
+            profile_model(model, X_test, y_test, save=lambda m, path: m.save(path), load=compact.load,
+                          filename="model" + compact.SUFFIX),
+            trees=model.n_trees,
+            agreement=float((proba.argmax(axis=1) == reference.argmax(axis=1)).mean()),
+            max_proba_diff=float(np.abs(proba - reference).max()),
+            **params,
+        )
+        variants[name] = model
+        print(f"{name:40s} {rows[name]['size_mb'] * 1024:8.1f} KB  accuracy {rows[name]['accuracy']:.4f}")
+
+    columns = ["trees", "accuracy", "agreement", "max_proba_diff", "single_ms", "batch_ms", "size_mb", "load_ms"]
+    print("\n=== Compaction Trade-offs ===")
+    print(pd.DataFrame(rows).T[columns].astype(float).round(4).to_string())
+
+    floor = rows["original"]["accuracy"] - args.accuracy_tolerance
+    eligible = [n for n in variants if rows[n]["accuracy"] >= floor]
+    chosen = min(eligible, key=lambda n: (rows[n]["size_mb"], rows[n]["single_ms"])) if eligible else None
+    with open(args.report, "w") as f:
+        json.dump({"model": args.model, "accuracy_floor": floor, "chosen": chosen, "variants": rows}, f, indent=2)
+    print(f"✅ Report written to '{args.report}'")
+    if chosen is None:
+        print(f"❌ No variant kept accuracy >= {floor:.4f}; nothing saved")
+        return 1
+
+    variants[chosen].save(args.output)
+    original, best = rows["original"], rows[chosen]
+    print(f"✅ {chosen} saved as '{args.output}': {original['size_mb'] * 1024:.0f} KB -> {best['size_mb'] * 1024:.0f} KB, "
+          f"accuracy {original['accuracy']:.4f} -> {best['accuracy']:.4f}")
+
+    if args.deploy:
+        manifest = {}
+        if os.path.exists(MANIFEST_FILE):
+            with open(MANIFEST_FILE) as f:
+                manifest = json.load(f)
+        manifest.update(model_file=os.path.basename(args.output), compaction={"source": args.model, "variant": best})
+        manifest.setdefault("encoder_file", "label_encoder.pkl")
+        with open(MANIFEST_FILE, "w") as f:
+            json.dump(manifest, f, indent=2)
+        print(f"✅ '{MANIFEST_FILE}' now serves '{args.output}' (copy both to Interface/, "
+              "then rerun Interface/decision_surface.py)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
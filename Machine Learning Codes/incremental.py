@@ -0,0 +1,153 @@
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import GroupShuffleSplit
+
+from tco_models import FEATURE_COLUMNS, load_dataset
+from resample import spectrum_keys
+import portable   # Interface/portable.py (tco_models puts Interface/ on the path)
+
+# === Incremental model updates ===
+# Continues boosting the deployed one-vs-rest XGBoost pipeline on newly
+# measured spectra only (xgb_model continuation), instead of retraining on the
+# full history:
+#   1. the StandardScaler statistics are updated with the new rows
+#      (partial_fit) and the existing trees' thresholds are re-expressed in the
+#      updated scaling, so old and new trees see the same feature space;
+#   2. each class booster gets --rounds more trees fitted on the new rows;
+#   3. the candidate is scored on the held-out set written by TCO.py and only
+#      promoted (pipeline, portable export, holdout) if it does not lose more
+#      than --accuracy-tolerance against the current model.
+# A share of the new spectra (whole spectra, so neighbouring wavelengths never
+# straddle the split) joins the held-out set on promotion, so validation keeps
+# covering the newest measurements.
+#
+#   python incremental.py new_measurements.csv
+#   python incremental.py week43.csv --spectrum SampleID
+#   python incremental.py week42.csv --rounds 50 --accuracy-tolerance 0.002 --dry-run
+HOLDOUT_FILE = "holdout.csv"
+PORTABLE_DIR = "xgb_portable"
+
+
+def rescale_booster(booster, old_mean, old_scale, new_mean, new_scale):
+    # Split thresholds are in scaled units: map them back to raw feature units
+    # with the old statistics, then forward with the new ones. Exact up to
+    # float32 rounding: a value sitting right on a histogram cut can change
+    # side (~0.05% of rows on TCO.csv), which validation below accounts for
+    model = json.loads(booster.save_raw("json"))
+    for tree in model["learner"]["gradient_booster"]["model"]["trees"]:
+        conditions = tree["split_conditions"]
+        for node, (left, feature) in enumerate(zip(tree["left_children"], tree["split_indices"])):
+            if left != -1:
+                raw = conditions[node] * old_scale[feature] + old_mean[feature]
+                conditions[node] = float((raw - new_mean[feature]) / new_scale[feature])
+    rescaled = xgb.Booster()
+    rescaled.load_model(bytearray(json.dumps(model).encode()))
+    return rescaled
+
+
+def update_pipeline(pipeline, classes, X_new, y_new, rounds):
+    # -> new pipeline; the deployed one is left untouched
+    candidate = copy.deepcopy(pipeline)
+    scaler, ovr = candidate.steps[0][1], candidate.steps[-1][1]
+    old_mean, old_scale = scaler.mean_.copy(), scaler.scale_.copy()
+    scaler.partial_fit(X_new)
+    X_scaled = scaler.transform(X_new)
+
+    for k, estimator in enumerate(ovr.estimators_):
+        booster = rescale_booster(estimator.get_booster(), old_mean, old_scale, scaler.mean_, scaler.scale_)
+        params = {key: value for key, value in estimator.get_xgb_params().items() if value is not None}
+        dtrain = xgb.DMatrix(X_scaled, label=(y_new == classes[k]).astype(np.float32))
+        estimator._Booster = xgb.train(params, dtrain, num_boost_round=rounds, xgb_model=booster)
+        estimator.set_params(n_estimators=estimator._Booster.num_boosted_rounds())
+    return candidate
+
+
+def split_spectra(frame, fraction, spectrum=None, seed=42):
+    # -> (train, held); whole spectra go to one side
+    keys = spectrum_keys(frame, "Material", spectrum)
+    if not fraction or len(np.unique(keys)) < 2:
+        return frame, frame.iloc[:0]
+    train, held = next(GroupShuffleSplit(n_splits=1, test_size=fraction, random_state=seed).split(frame, groups=keys))
+    return frame.iloc[train], frame.iloc[held]
+
+
+def evaluate(pipeline, classes, holdout):
+    proba = np.nan_to_num(pipeline.predict_proba(holdout[FEATURE_COLUMNS]))
+    return accuracy_score(holdout["Material"], np.asarray(classes)[proba.argmax(axis=1)])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Continue training the deployed XGBoost pipeline on new measurements.")
+    parser.add_argument("new", help="CSV with the new measurements (TCO.csv columns, incl. Material)")
+    parser.add_argument("--model", default="xgb_pipeline_model.pkl", help="current pipeline (default: %(default)s)")
+    parser.add_argument("--encoder", default="label_encoder.pkl", help="label encoder (default: %(default)s)")
+    parser.add_argument("--holdout", default=HOLDOUT_FILE, help="held-out validation set (default: %(default)s)")
+    parser.add_argument("--spectrum", help="column identifying each measured spectrum (default: split where a "
+                        "material's wavelength sweep restarts)")
+    parser.add_argument("--rounds", type=int, default=20, help="trees added per class (default: %(default)s)")
+    parser.add_argument("--holdout-fraction", type=float, default=0.2,
+                        help="share of the new spectra kept out of training and added to the held-out set (default: %(default)s)")
+    parser.add_argument("--accuracy-tolerance", type=float, default=0.0,
+                        help="max held-out accuracy loss allowed for promotion (default: %(default)s)")
+    parser.add_argument("--dry-run", action="store_true", help="validate only; never promote")
+    args = parser.parse_args(argv)
+
+    pipeline = joblib.load(args.model)
+    classes = joblib.load(args.encoder).classes_
+    if not all(hasattr(e, "get_booster") for e in getattr(pipeline.steps[-1][1], "estimators_", [None])):
+        print(f"❌ {args.model} is not a one-vs-rest XGBoost pipeline; retrain with TCO.py")
+        return 1
+    if not os.path.exists(args.holdout):
+        print(f"❌ No held-out set at '{args.holdout}' (TCO.py writes it); refusing to promote unvalidated models")
+        return 1
+
+    try:
+        new = load_dataset(args.new, spectrum=args.spectrum)
+    except KeyError as e:
+        print(f"❌ {args.new} has no column {e}; check --spectrum")
+        return 1
+    unknown = sorted(set(new["Material"]) - set(classes))
+    if unknown:
+        print(f"❌ New material(s) {', '.join(unknown)}: the class set changed, retrain with TCO.py")
+        return 1
+    train, held = split_spectra(new, args.holdout_fraction, args.spectrum)
+    if args.holdout_fraction and not len(held):
+        print("   Only one new spectrum: nothing held out from it, all of it is used for training")
+    holdout = pd.concat([pd.read_csv(args.holdout), held[FEATURE_COLUMNS + ["Material"]]], ignore_index=True)
+
+    started = time.perf_counter()
+    candidate = update_pipeline(pipeline, classes, train[FEATURE_COLUMNS], train["Material"].to_numpy(), args.rounds)
+    elapsed = time.perf_counter() - started
+
+    current_accuracy = evaluate(pipeline, classes, holdout)
+    candidate_accuracy = evaluate(candidate, classes, holdout)
+    print(f"Updated on {len(train)} new rows in {elapsed:.2f}s (+{args.rounds} trees per class)")
+    print(f"Held-out accuracy ({len(holdout)} rows): current {current_accuracy:.4f} -> candidate {candidate_accuracy:.4f}")
+
+    if candidate_accuracy < current_accuracy - args.accuracy_tolerance:
+        print(f"❌ Candidate lost more than {args.accuracy_tolerance} accuracy; keeping the current model")
+        return 1
+    if args.dry_run:
+        print("✅ Candidate passed validation (dry run, nothing promoted)")
+        return 0
+
+    joblib.dump(candidate, args.model)
+    portable.export(candidate, classes, PORTABLE_DIR, FEATURE_COLUMNS)
+    holdout.to_csv(args.holdout, index=False)
+    print(f"✅ Promoted: '{args.model}' and '{PORTABLE_DIR}/' updated, {len(held)} new rows added to '{args.holdout}'")
+    print("   After deploying, rerun Interface/decision_surface.py so the decision surfaces match the new model")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.preprocessing import LabelBinarizer, LabelEncoder, StandardScaler
+
+from tco_models import FEATURE_COLUMNS, make_models
+from resample import resample_frame, spectrum_keys
+from incremental import HOLDOUT_FILE, PORTABLE_DIR
+import portable   # Interface/portable.py (tco_models puts Interface/ on the path)
+
+# === Out-of-core training ===
+# Trains the same StandardScaler + one-vs-rest XGBoost pipeline as TCO.py on a
+# CSV that does not fit in memory. The file is only ever read in chunks:
+#   1. a statistics pass fits the scaler (partial_fit) and counts classes on
+#      the training rows;
+#   2. an xgb.DataIter streams scaled, class-balanced chunks into an
+#      ExtMemQuantileDMatrix, whose quantized pages live in an on-disk cache;
+#      the five class boosters are trained from it in turn;
+#   3. an evaluation pass scores the held-out rows chunk by chunk.
+# Class balancing replaces SMOTE with chunked random oversampling: each
+# training row of class c is repeated max_count / count_c times on average
+# (whole part + Bernoulli remainder), drawn from a per-chunk seed so every
+# pass over the file sees identical data. The train/test split is drawn the
+# same way, and a reservoir sample of the test rows becomes holdout.csv for
+# incremental.py. Memory is bounded by the chunk size plus XGBoost's per-row
+# labels, not by the dataset size.
+#
+#   python out_of_core.py archive.csv --chunk-rows 200000
+#   python out_of_core.py archive.csv --spectrum SampleID --cache-dir /scratch
+CHUNK_ROWS = 200_000
+HOLDOUT_ROWS = 100_000
+
+
+def read_chunks(path, chunk_rows, spectrum=None):
+    # Resampled chunks of whole spectra: the last spectrum of each raw chunk
+    # may continue in the next one, so it is carried over (spectra must be
+    # contiguous in the file). A spectrum is a `spectrum` id, or a material's
+    # sweep up to where its wavelength restarts
+    carry = None
+    for chunk in pd.read_csv(path, chunksize=chunk_rows):
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        keys = spectrum_keys(chunk, "Material", spectrum)
+        last = keys == keys[-1]
+        carry, chunk = chunk[last], chunk[~last]
+        if len(carry) > chunk_rows:
+            raise ValueError(f"A spectrum in {path} spans more than {chunk_rows} rows; "
+                             "raise --chunk-rows or name the spectrum column with --spectrum")
+        if len(chunk):
+            yield _resampled(chunk, spectrum)
+    if carry is not None and len(carry):
+        yield _resampled(carry, spectrum)
+
+
+def _resampled(chunk, spectrum):
+    return resample_frame(chunk, FEATURE_COLUMNS, group="Material", spectrum=spectrum)
+
+
+def split_chunk(chunk, index, test_size, seed):
+    # Per-chunk seeded draw: the same rows are held out on every pass
+    rng = np.random.default_rng([seed, index])
+    test = rng.random(len(chunk)) < test_size
+    return chunk[~test], chunk[test], rng
+
+
+def oversample(frame, codes, rates, rng):
+    # Row i of class c is repeated floor(rate_c) times, plus once more with
+    # probability frac(rate_c)
+    rate = rates[codes]
+    repeats = np.floor(rate).astype(np.int64) + (rng.random(len(rate)) < rate % 1)
+    index = np.repeat(np.arange(len(frame)), repeats)
+    return frame.iloc[index], codes[index]
+
+
+class ChunkIterator(xgb.DataIter):
+    # Streams scaled, balanced training chunks into XGBoost's external memory
+    def __init__(self, path, chunk_rows, spectrum, scaler, classes, rates, test_size, seed, cache_prefix):
+        self.args = (path, chunk_rows, spectrum)
+        self.scaler, self.classes, self.rates = scaler, classes, rates
+        self.test_size, self.seed = test_size, seed
+        self._chunks = None
+        self._index = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data):
+        if self._chunks is None:
+            self._chunks = read_chunks(*self.args)
+        for chunk in self._chunks:
+            train, _, rng = split_chunk(chunk, self._index, self.test_size, self.seed)
+            self._index += 1
+            codes = np.searchsorted(self.classes, train["Material"].to_numpy())
+            if self.rates is not None:
+                train, codes = oversample(train, codes, self.rates, rng)
+            if len(train):
+                input_data(data=self.scaler.transform(train[FEATURE_COLUMNS]), label=codes)
+                return True
+        return False
+
+    def reset(self):
+        self._chunks = None
+        self._index = 0
+
+
+def statistics_pass(path, chunk_rows, spectrum, test_size, seed, holdout_rows):
+    # -> (scaler, {material: training rows}, reservoir of held-out rows)
+    scaler = StandardScaler()
+    counts = {}
+    reservoir = pd.DataFrame()
+    for index, chunk in enumerate(read_chunks(path, chunk_rows, spectrum)):
+        train, test, rng = split_chunk(chunk, index, test_size, seed)
+        if len(train):
+            scaler.partial_fit(train[FEATURE_COLUMNS])
+        for material, n in train["Material"].value_counts().items():
+            counts[material] = counts.get(material, 0) + n
+        # Reservoir sample: keep the rows with the smallest random keys
+        keyed = test[FEATURE_COLUMNS + ["Material"]].assign(_key=rng.random(len(test)))
+        reservoir = pd.concat([reservoir, keyed]).nsmallest(holdout_rows, "_key")
+    return scaler, counts, reservoir.drop(columns="_key")
+
+
+def assemble_pipeline(scaler, boosters, n_classes):
+    # Same object layout as TCO.py's fitted XGBoost pipeline
+    pipeline = make_models()["XGBoost"]
+    pipeline.steps[0] = (pipeline.steps[0][0], scaler)
+    ovr = pipeline.steps[-1][1]
+    ovr.estimators_ = []
+    for booster in boosters:
+        estimator = xgb.XGBClassifier()
+        estimator.load_model(bytearray(booster.save_raw("ubj")))
+        ovr.estimators_.append(estimator)
+    ovr.label_binarizer_ = LabelBinarizer(sparse_output=True).fit(np.arange(n_classes))
+    return pipeline
+
+
+def evaluate(pipeline, classes, path, chunk_rows, spectrum, test_size, seed):
+    correct = total = 0
+    for index, chunk in enumerate(read_chunks(path, chunk_rows, spectrum)):
+        _, test, _ = split_chunk(chunk, index, test_size, seed)
+        if len(test):
+            proba = np.nan_to_num(pipeline.predict_proba(test[FEATURE_COLUMNS]))
+            correct += int((classes[proba.argmax(axis=1)] == test["Material"].to_numpy()).sum())
+            total += len(test)
+    return correct / total if total else float("nan")
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the XGBoost pipeline out of core on a large CSV.")
+    parser.add_argument("data", nargs="?", default="TCO.csv", help="CSV with TCO.csv's columns (default: %(default)s)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="raw rows read per chunk (default: %(default)s)")
+    parser.add_argument("--spectrum", help="column identifying each spectrum (default: split where a material's "
+                        "wavelength sweep restarts)")
+    parser.add_argument("--test-size", type=float, default=0.2, help="held-out share (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-oversample", action="store_true", help="train on the natural class balance")
+    parser.add_argument("--holdout-rows", type=int, default=HOLDOUT_ROWS,
+                        help=f"held-out rows kept in {HOLDOUT_FILE} (default: %(default)s)")
+    parser.add_argument("--cache-dir", help="directory for XGBoost's external-memory pages (default: system temp)")
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+
+    scaler, counts, holdout = statistics_pass(args.data, args.chunk_rows, args.spectrum, args.test_size, args.seed, args.holdout_rows)
+    classes = np.array(sorted(counts))
+    n_train = np.array([counts[c] for c in classes], dtype=np.float64)
+    rates = None if args.no_oversample else n_train.max() / n_train
+    print(f"Statistics pass: {int(n_train.sum())} training rows, classes "
+          + ", ".join(f"{c}={int(n)}" for c, n in zip(classes, n_train)) + f" ({peak_rss_mb():.0f} MB peak RSS)")
+
+    estimator = make_models()["XGBoost"].steps[-1][1].estimator
+    params = {key: value for key, value in estimator.get_xgb_params().items() if value is not None}
+    boosters = []
+    with tempfile.TemporaryDirectory(prefix="tco-extmem-", dir=args.cache_dir) as cache:
+        iterator = ChunkIterator(args.data, args.chunk_rows, args.spectrum, scaler, classes, rates,
+                                 args.test_size, args.seed, os.path.join(cache, "train"))
+        dtrain = xgb.ExtMemQuantileDMatrix(iterator)
+        codes = dtrain.get_label()
+        print(f"External-memory matrix: {dtrain.num_row()} rows after balancing ({peak_rss_mb():.0f} MB peak RSS)")
+        for k, material in enumerate(classes):
+            dtrain.set_label((codes == k).astype(np.float32))
+            boosters.append(xgb.train(params, dtrain, num_boost_round=estimator.n_estimators))
+            print(f"  {material}: {estimator.n_estimators} trees ({peak_rss_mb():.0f} MB peak RSS)")
+        del dtrain, codes
+
+    pipeline = assemble_pipeline(scaler, boosters, len(classes))
+    accuracy = evaluate(pipeline, classes, args.data, args.chunk_rows, args.spectrum, args.test_size, args.seed)
+    print(f"Held-out accuracy: {accuracy:.4f}")
+
+    label_encoder = LabelEncoder()
+    label_encoder.classes_ = classes
+    joblib.dump(pipeline, "xgb_pipeline_model.pkl")
+    joblib.dump(label_encoder, "label_encoder.pkl")
+    portable.export(pipeline, classes, PORTABLE_DIR, FEATURE_COLUMNS)
+    holdout.to_csv(HOLDOUT_FILE, index=False)
+    print(f"✅ Pipeline saved as 'xgb_pipeline_model.pkl' and '{PORTABLE_DIR}/', {len(holdout)} rows in '{HOLDOUT_FILE}'")
+    print("   After deploying, rerun Interface/decision_surface.py so the decision surfaces match the new model")
+    print(f"✅ Done in {time.perf_counter() - started:.1f}s, peak RSS {peak_rss_mb():.0f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
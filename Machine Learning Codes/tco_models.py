@@ -0,0 +1,59 @@
+import os
+import sys
+
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.pipeline import make_pipeline
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.neural_network import MLPClassifier
+from xgboost import XGBClassifier
+from sklearn.svm import SVC
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.multiclass import OneVsRestClassifier
+
+# === Shared training setup ===
+# Dataset preparation and model definitions used by TCO.py and by the
+# benchmark suite (Interface/benchmark.py), so both always fit the same models.
+
+# Shared with the Interface so training and serving see the same grid
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Interface"))
+from resample import resample_frame
+
+FEATURE_COLUMNS = ["Wavelength", "AbsorptionRate", "Transmission", "OpticalDensity"]
+
+
+def load_dataset(path="TCO.csv", spectrum=None):
+    # Align every spectrum onto the 1 nm 300-800 nm grid in one vectorized
+    # pass; spectra recorded at other steps or ranges are interpolated so all
+    # classes share the wavelength axis the model is served on. `spectrum`
+    # names a column identifying each measurement; without it a material's
+    # spectra are split where the wavelength sweep restarts
+    df = pd.read_csv(path)
+    return resample_frame(df, FEATURE_COLUMNS, group="Material", spectrum=spectrum)
+
+
+def split_dataset(df, oversample=True):
+    # Encoded labels + 80/20 split; SMOTE on the training part only
+    X = df[FEATURE_COLUMNS]
+    le = LabelEncoder()
+    y_encoded = le.fit_transform(df["Material"])
+    X_train, X_test, y_train, y_test = train_test_split(X, y_encoded, test_size=0.2, random_state=42)
+    if oversample:
+        from imblearn.over_sampling import SMOTE
+        X_train, y_train = SMOTE(random_state=42).fit_resample(X_train, y_train)
+    return le, X, y_encoded, X_train, X_test, y_train, y_test
+
+
+def make_models():
+    # Every candidate is a Pipeline so any of them can be deployed as-is
+    return {
+        "SVC": make_pipeline(StandardScaler(), OneVsRestClassifier(SVC(probability=True, C=10, kernel='rbf'))),
+        "KNN": make_pipeline(StandardScaler(), OneVsRestClassifier(KNeighborsClassifier(n_neighbors=3))),
+        "Decision Tree": make_pipeline(OneVsRestClassifier(DecisionTreeClassifier())),
+        "Random Forest": make_pipeline(OneVsRestClassifier(RandomForestClassifier(n_estimators=200))),
+        "XGBoost": make_pipeline(StandardScaler(), OneVsRestClassifier(XGBClassifier(
+            eval_metric='mlogloss', learning_rate=0.1, n_estimators=200, max_depth=10))),
+        "MLP": make_pipeline(StandardScaler(), OneVsRestClassifier(MLPClassifier(max_iter=500)))
+    }